@@ -34,6 +34,9 @@ extensions = [
     'sphinx.ext.autodoc'
 ]
 
+# Optional dependencies, so the docs build without them installed
+autodoc_mock_imports = ['serial_asyncio']
+
 # Add any paths that contain templates here, relative to this directory.
 templates_path = ['_templates']
 
@@ -18,112 +18,147 @@
     along with this program.  If not, see <http://www.gnu.org/licenses/>
 """
 
-import glob
 import signal
-import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-import gi
 import pkg_resources
-import serial
+from serial.tools import list_ports
 
-gi.require_version('Gtk', '3.0')
-gi.require_version('AppIndicator3', '0.1')
-gi.require_version('Notify', '0.7')
-
-from gi.repository import Gtk as gtk
-from gi.repository import AppIndicator3 as appindicator
-from gi.repository import Notify as notify
+# GTK, AppIndicator, Notify and GLib are loaded by load_gi(), so that importing
+# this module (e.g. for serial_ports()) doesn't pay for loading the typelibs
+gtk = None
+appindicator = None
+notify = None
+glib = None
 
 try:
-    from tenma.tenmaDcLib import instantiate_tenma_class_from_device_response, TenmaException
+    from tenma.tenmaDcLib import (instantiate_tenma_class_from_device_response, forgetDetectedModel,
+                                  TenmaException)
 except Exception:
-    from tenmaDcLib import instantiate_tenma_class_from_device_response, TenmaException
+    from tenmaDcLib import (instantiate_tenma_class_from_device_response, forgetDetectedModel,
+                            TenmaException)
 
 
 APPINDICATOR_ID = 'Tenma DC Power'
+#: Seconds the output stays off on RESET, so the attached device power cycles
+RESET_OFF_TIME = 0.2
+
+
+def load_gi():
+    """
+        Imports GTK, AppIndicator, Notify and GLib into this module, once
+    """
+    global gtk, appindicator, notify, glib
+    if gtk is not None:
+        return
+
+    import gi
+    gi.require_version('Gtk', '3.0')
+    gi.require_version('AppIndicator3', '0.1')
+    gi.require_version('Notify', '0.7')
+
+    from gi.repository import Gtk
+    from gi.repository import AppIndicator3
+    from gi.repository import Notify
+    from gi.repository import GLib
+
+    gtk, appindicator, notify, glib = Gtk, AppIndicator3, Notify, GLib
 
 
 def serial_ports():
     """ Lists serial port names
-        Shamesly ripped from stackOverflow
 
-        :raises EnvironmentError:
-            On unsupported or unknown platforms
+        Asks the OS for its own list of serial devices (the registry on
+        Windows, sysfs on Linux) instead of trying to open every candidate.
+
         :returns:
             A list of the serial ports available on the system
     """
-    if sys.platform.startswith('win'):
-        ports = ['COM%s' % (i + 1) for i in range(256)]
-    elif sys.platform.startswith('linux') or sys.platform.startswith('cygwin'):
-        # this excludes your current terminal "/dev/tty"
-        ports = glob.glob('/dev/tty[A-Za-z]*')
-    elif sys.platform.startswith('darwin'):
-        ports = glob.glob('/dev/tty.*')
-    else:
-        raise EnvironmentError('Unsupported platform')
-
-    result = []
-    for port in ports:
-        try:
-            s = serial.Serial(port)
-            s.close()
-            result.append(port)
-        except (OSError, serial.SerialException):
-            pass
-    return result
+    return [p.device for p in list_ports.comports()]
 
 
 class gtkController():
+    __slots__ = ("serialPort", "serialMenu", "memoryMenu", "T", "itemSet", "_io",
+                 "item_connectedPort", "item_unit_version")
+
     def __init__(self):
+        load_gi()
         self.serialPort = "No Port"
         self.serialMenu = None
         self.memoryMenu = None
 
         self.T = None
         self.itemSet = []
-        pass
+        # Serial I/O runs here so a slow or dead port doesn't freeze the menu.
+        # A single worker keeps the commands in the order they were clicked
+        self._io = ThreadPoolExecutor(max_workers=1)
+
+    def runSerial(self, job, done=None, failed=None):
+        """
+            Runs job() on the serial worker thread. Once it finishes,
+            done(result) or failed(exception) is called from the GTK main loop.
+            Errors are always notified.
+        """
+        future = self._io.submit(job)
+        future.add_done_callback(
+            lambda future: glib.idle_add(self._serialJobDone, future, done, failed))
+
+    def _serialJobDone(self, future, done, failed):
+        error = future.exception()
+        if error is not None:
+            notify.Notification.new("<b>ERROR</b>", repr(error),
+                                    gtk.STOCK_DIALOG_ERROR).show()
+            if failed:
+                failed(error)
+        elif done:
+            done(future.result())
+        # Run once, don't keep it as an idle handler
+        return False
 
     def portSelected(self, source):
-        oldPort = self.serialPort
-        self.serialPort = source.get_label()
+        port = source.get_label()
 
-        try:
+        def connect():
             if not self.T:
-                self.T = instantiate_tenma_class_from_device_response(self.serialPort)
+                self.T = instantiate_tenma_class_from_device_response(port)
             else:
-                self.T.setPort(self.serialPort)
-        except Exception as e:
-            self.setItemSetStatus(False)
-            notify.Notification.new("<b>ERROR</b>", repr(e),
-                                    gtk.STOCK_DIALOG_ERROR).show()
-            self.serialPort = oldPort
+                self.T.setPort(port)
+            return self.T.getVersion()
+
+        def connected(ver):
+            if not ver:
+                notify.Notification.new("<b>ERROR</b>",
+                                        "No response on %s" % port,
+                                        gtk.STOCK_DIALOG_ERROR).show()
+                self.setItemSetStatus(False)
+            else:
+                notify.Notification.new("<b>CONNECTED TO</b>", ver, None).show()
+                self.serialPort = port
+                self.setItemSetStatus(True)
 
-        ver = self.T.getVersion()
-        if not ver:
-            notify.Notification.new("<b>ERROR</b>",
-                                    "No response on %s" % self.serialPort,
-                                    gtk.STOCK_DIALOG_ERROR).show()
-            self.serialPort = oldPort
+            self.item_connectedPort.set_label(self.serialPort)
+            self.item_unit_version.set_label(ver[:20])
+            self.memoryMenu = self.build_memory_submenu(None, self.T.NCONFS)
+
+        def failed(error):
+            # Detect the model again next time, another unit may be plugged in
+            forgetDetectedModel(port)
             self.setItemSetStatus(False)
-        else:
-            notify.Notification.new("<b>CONNECTED TO</b>", ver, None).show()
-            self.setItemSetStatus(True)
 
-        self.item_connectedPort.set_label(self.serialPort)
-        self.item_unit_version.set_label(ver[:20])
-        self.memoryMenu = self.build_memory_submenu(None, self.T.NCONFS)
+        self.runSerial(connect, connected, failed)
 
     def memorySelected(self, source):
         """
             Select one of the multiple memories
         """
-        try:
-            memory_index = source.get_label()
+        memory_index = int(source.get_label())
+
+        def recall():
             self.T.OFF()
-            self.T.recallConf(int(memory_index))
-        except Exception as e:
-            notify.Notification.new("<b>ERROR</b>", repr(e),
-                                    gtk.STOCK_DIALOG_ERROR).show()
+            self.T.recallConf(memory_index)
+
+        self.runSerial(recall)
 
     def build_memory_submenu(self, source, nmemories):
         """
@@ -173,10 +208,9 @@ class gtkController():
         return self.serialMenu
 
     def setItemSetStatus(self, onOff):
-        if onOff:
-            [i.set_sensitive(True) for i in self.itemSet]
-        else:
-            [i.set_sensitive(False) for i in self.itemSet]
+        sensitive = bool(onOff)
+        for item in self.itemSet:
+            item.set_sensitive(sensitive)
 
     def build_gtk_menu(self):
         serialMenu = self.build_serial_submenu(None)
@@ -239,32 +273,26 @@ class gtkController():
         return menu
 
     def quit(self, source):
+        self._io.shutdown(wait=False)
         gtk.main_quit(self)
 
     def tenmaTurnOn(self, source):
-        try:
-            self.T.ON()
-        except Exception as e:
-            notify.Notification.new("<b>ERROR</b>", repr(e),
-                                    gtk.STOCK_DIALOG_ERROR).show()
+        self.runSerial(lambda: self.T.ON())
 
     def tenmaTurnOff(self, source):
-        try:
-            self.T.OFF()
-        except Exception as e:
-            notify.Notification.new("<b>ERROR</b>", repr(e),
-                                    gtk.STOCK_DIALOG_ERROR).show()
+        self.runSerial(lambda: self.T.OFF())
 
     def tenmaReset(self, source):
-        try:
+        def reset():
             self.T.OFF()
+            time.sleep(RESET_OFF_TIME)
             self.T.ON()
-        except Exception as e:
-            notify.Notification.new("<b>ERROR</b>", repr(e),
-                                    gtk.STOCK_DIALOG_ERROR).show()
+
+        self.runSerial(reset)
 
 
 def main():
+    load_gi()
     notify.init(APPINDICATOR_ID)
     controller = gtkController()
     indicator = appindicator.Indicator.new(APPINDICATOR_ID,
@@ -0,0 +1,460 @@
+#    Copyright (C) 2017-2023 Jordi Castells
+#
+#
+#   this file is part of tenma-serial
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""
+    tenmaAsyncLib is an asyncio flavour of tenmaDcLib, for controlling a
+    Tenma 72-XXXX power supply from an event loop.
+
+    Instead of blocking on the serial port, every query waits on the reply
+    being framed by the serial transport, so other tasks keep running while
+    the unit answers. Concurrent calls on one instance take turns, one
+    command and reply exchange at a time.
+
+    It needs pyserial-asyncio, which is not installed by default::
+
+        pip install tenma-serial[async]
+
+    Limits and commands come from the synchronous model classes of
+    tenmaDcLib. Only the commands common to the 72-XXXX family are provided,
+    use the synchronous classes for model specific extras (tracking, steps,
+    per channel outputs...).
+"""
+
+import asyncio
+import time
+
+import serial
+import serial_asyncio
+
+from .tenmaDcLib import (Tenma72Base, Tenma72_2545, TenmaException, TenmaSerialHandler,
+                         _modelForVersion, _verifyReadback)
+
+
+class _FramedProtocol(asyncio.Protocol):
+    """
+        Collects the bytes received from the unit and flags when the
+        expected reply frame is complete
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.buffer = bytearray()
+        self.frameReceived = asyncio.Event()
+        self.size = None
+        self.eol = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buffer += data
+        if self._frameComplete():
+            self.frameReceived.set()
+
+    def connection_lost(self, exc):
+        # Wake up any pending reader, it will find whatever was received
+        self.frameReceived.set()
+
+    def _frameComplete(self):
+        if self.size:
+            return len(self.buffer) >= self.size
+        if self.eol:
+            return self.eol in self.buffer
+        return bool(self.buffer)
+
+    def expect(self, size=None, eol=b""):
+        """
+            Prepares for a new reply, discarding leftovers of earlier ones
+
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :param eol: Reply terminator, used when the size is unknown
+            :type eol: bytes
+        """
+        self.size = size
+        self.eol = eol
+        del self.buffer[:]
+        self.frameReceived.clear()
+
+    def takeFrame(self):
+        """
+            :return: The received reply, up to its expected length or terminator
+        """
+        end = len(self.buffer)
+        if self.size:
+            end = min(end, self.size)
+        elif self.eol and self.eol in self.buffer:
+            end = self.buffer.index(self.eol) + len(self.eol)
+        frame = bytes(self.buffer[:end])
+        del self.buffer[:end]
+        return frame
+
+
+class AsyncTenma72Base(object):
+    """
+        Control a Tenma 72-XXXX DC bench power supply from asyncio
+
+        Create instances with :meth:`open`, which can also detect the model::
+
+            psu = await AsyncTenma72Base.open('/dev/ttyUSB0')
+            await psu.setVoltage(1, 5000)
+            await psu.ON()
+            psu.close()
+    """
+    #: Seconds to wait for a reply
+    TIMEOUT = TenmaSerialHandler.TIMEOUT
+    #: Seconds of silence that end a reply of unknown length on units without EOL
+    INTER_BYTE_TIMEOUT = TenmaSerialHandler.INTER_BYTE_TIMEOUT
+    #: Seconds of silence units without an EOL need to tell two commands apart
+    COMMAND_GAP = TenmaSerialHandler.COMMAND_GAP
+    #: Seconds per byte on the wire at 9600 8N1
+    BYTE_TIME = TenmaSerialHandler.BYTE_TIME
+
+    def __init__(self, transport, protocol, model=Tenma72Base, debug=False):
+        """
+            Use :meth:`open` rather than creating instances directly
+
+            :param transport: Serial transport from pyserial-asyncio
+            :param protocol: _FramedProtocol attached to the transport
+            :param model: tenmaDcLib class of the unit, defaults to Tenma72Base
+            :type model: class
+            :param debug: Print the serial traffic, defaults to False
+            :type debug: boolean
+        """
+        self.transport = transport
+        self.protocol = protocol
+        self.model = model
+        # An unconnected model instance, only used for its limits and checks
+        self.limits = model.__new__(model)
+        self._EOL_BYTES = model.SERIAL_EOL.encode("ascii")
+        self._nextWrite = 0.0
+        # Held across each exchange with the unit, so that concurrent tasks
+        # don't take each other's replies or squeeze in between a command
+        # and its reply
+        self._lock = asyncio.Lock()
+        self.DEBUG = debug
+
+    @classmethod
+    async def open(cls, serialPort, model=None, debug=False):
+        """
+            Opens the serial port of a power supply
+
+            :param serialPort: COM/tty device
+            :type serialPort: string
+            :param model: tenmaDcLib class of the unit, detected from its version
+                          reply when not given
+            :type model: class
+            :param debug: Print the serial traffic, defaults to False
+            :type debug: boolean
+            :return: An AsyncTenma72Base instance
+        """
+        loop = asyncio.get_running_loop()
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            loop, _FramedProtocol, serialPort,
+            baudrate=9600,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE)
+        try:
+            powerSupply = cls(transport, protocol, model=model or Tenma72Base, debug=debug)
+            if model is None:
+                await powerSupply._detectModel()
+        except BaseException:
+            transport.close()
+            raise
+        return powerSupply
+
+    async def _detectModel(self):
+        """
+            Switches to the model class matching the version reply of the unit.
+            Same logic as tenmaDcLib.instantiate_tenma_class_from_device_response
+        """
+        ver = await self._query(b"*IDN?")
+        if not ver:
+            if self.DEBUG:
+                print("No version found, retrying with newline EOL")
+            ver = await self._query(b"*IDN?\n")
+
+        cls = _modelForVersion(ver)
+        if cls is None:
+            print("Could not detect Tenma power supply model, assuming 72_2545")
+            cls = Tenma72_2545
+
+        self.model = cls
+        self.limits = cls.__new__(cls)
+        self._EOL_BYTES = cls.SERIAL_EOL.encode("ascii")
+
+    async def _sendCommand(self, command, wait=0.0):
+        """
+            Sends a command to the power supply
+
+            :param command: Command to send
+            :type command: string or bytes
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
+            :type wait: float
+        """
+        async with self._lock:
+            await self._write(command)
+            if wait:
+                await asyncio.sleep(wait)
+
+    async def _write(self, command):
+        """
+            Writes a command, the lock must be held
+
+            As TenmaSerialHandler._write, on units without an EOL the
+            command is held back until the previous one left the wire plus
+            COMMAND_GAP, waiting on the event loop rather than blocking it.
+
+            :param command: Command to send
+            :type command: string or bytes
+        """
+        if not isinstance(command, bytes):
+            command = command.encode("ascii")
+        if self.DEBUG:
+            print(">> ", command.decode("ascii").strip())
+        if self._nextWrite:
+            delay = self._nextWrite - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._nextWrite = 0.0
+        data = command + self._EOL_BYTES
+        self.transport.write(data)
+        if not self._EOL_BYTES:
+            self._nextWrite = (time.monotonic() + len(data) * self.BYTE_TIME +
+                               self.COMMAND_GAP)
+
+    async def _query(self, command, size=None):
+        """
+            Sends a command and waits for the reply frame of the unit
+
+            The frame is complete once size bytes or the EOL arrived. For
+            replies of unknown length on units without EOL, it is complete
+            once the unit stops sending for INTER_BYTE_TIMEOUT.
+
+            :param command: Command to send
+            :type command: string or bytes
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Reply as bytes, empty if the unit did not answer in time
+        """
+        protocol = self.protocol
+        async with self._lock:
+            protocol.expect(size, self._EOL_BYTES)
+            await self._write(command)
+            try:
+                await asyncio.wait_for(protocol.frameReceived.wait(), self.TIMEOUT)
+                if not size and not self._EOL_BYTES:
+                    while True:
+                        protocol.frameReceived.clear()
+                        await asyncio.wait_for(protocol.frameReceived.wait(),
+                                               self.INTER_BYTE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+
+            reply = protocol.takeFrame()
+            if reply:
+                # The unit took the command, no need to hold the next one back
+                self._nextWrite = 0.0
+        if self.DEBUG:
+            print("<< ", reply)
+        return reply
+
+    async def _queryReading(self, command):
+        """
+            :return: Numeric reading replied to command, as a float
+        """
+        reply = await self._query(command, self.limits._READING_REPLY_LEN)
+        # 72-2550 appends sixth byte from *IDN? to current reading due to firmware bug
+        return float(reply[:5])
+
+    def close(self):
+        """
+            Closes the serial port
+        """
+        self.transport.close()
+
+    async def getVersion(self):
+        """
+            :return: The version string from the power supply
+        """
+        return (await self._query(b"*IDN?")).decode("ascii")
+
+    async def getStatus(self):
+        """
+            Returns the power supply status as a dictionary of values.
+            See getStatus of the model class for the keys.
+
+            :return: Dictionary of status values
+        """
+        statusBytes = await self._query(self.limits._CMD_STATUS,
+                                        self.limits._STATUS_REPLY_LEN)
+        if not statusBytes:
+            raise TenmaException("No status reply from the unit")
+        return dict(self.limits._STATUS_TABLE[statusBytes[0]])
+
+    async def readCurrent(self, channel):
+        """
+            :param channel: Channel to read the current of
+            :type channel: int
+            :return: Current for the channel in Amps as a float
+        """
+        self.limits._checkCurrentChannel(channel)
+        return await self._queryReading("ISET{}?".format(channel))
+
+    async def setCurrent(self, channel, mA, verify=True):
+        """
+            Sets the current of the specified channel
+
+            :param channel: Channel to set the current of
+            :type channel: int
+            :param mA: Current to set the channel to, in mA
+            :type mA: int
+            :param verify: Read the current back to check it was set, defaults to True
+            :type verify: boolean
+            :raises TenmaException: If the current does not match what was set
+            :return: The current the channel was set to in Amps as a float
+        """
+        await self._sendCommand(self.limits._currentCommand(channel, mA))
+        if not verify:
+            return mA / 1000.0
+
+        return _verifyReadback(mA, await self.readCurrent(channel), "A")
+
+    async def readVoltage(self, channel):
+        """
+            :param channel: Channel to read the voltage of
+            :type channel: int
+            :return: Voltage for the channel in Volts as a float
+        """
+        self.limits.checkChannel(channel)
+        return await self._queryReading("VSET{}?".format(channel))
+
+    async def setVoltage(self, channel, mV, verify=True):
+        """
+            Sets the voltage of the specified channel
+
+            :param channel: Channel to set the voltage of
+            :type channel: int
+            :param mV: voltage to set the channel to, in mV
+            :type mV: int
+            :param verify: Read the voltage back to check it was set, defaults to True
+            :type verify: boolean
+            :raises TenmaException: If the voltage does not match what was set
+            :return: The voltage the channel was set to in Volts as a float
+        """
+        await self._sendCommand(self.limits._voltageCommand(channel, mV))
+        if not verify:
+            return mV / 1000.0
+
+        return _verifyReadback(mV, await self.readVoltage(channel), "V")
+
+    async def runningCurrent(self, channel):
+        """
+            :param channel: Channel to get the running current for
+            :type channel: int
+            :return: The running current of the channel in Amps as a float
+        """
+        self.limits._checkCurrentChannel(channel)
+        return await self._queryReading("IOUT{}?".format(channel))
+
+    async def runningVoltage(self, channel):
+        """
+            :param channel: Channel to get the running voltage for
+            :type channel: int
+            :return: The running voltage of the channel in volts as a float
+        """
+        self.limits.checkChannel(channel)
+        return await self._queryReading("VOUT{}?".format(channel))
+
+    async def saveConf(self, conf):
+        """
+            Save current configuration into Memory. See saveConfFlow.
+
+            :param conf: Memory index to store to
+            :type conf: int
+        """
+        self.limits.checkConf(conf)
+        await self._sendCommand("SAV{}".format(conf), wait=self.limits.MEMORY_SETTLE_TIME)
+
+    async def saveConfFlow(self, conf, channel):
+        """
+            Performs a full save flow for the unit, as Tenma72Base.saveConfFlow
+
+            :param conf: Memory index to store to
+            :type conf: int
+            :param channel: Channel with output to store
+            :type channel: int
+        """
+        self.limits.checkConf(conf)
+        await self.OFF()
+
+        volt = await self.readVoltage(channel)
+        curr = await self.readCurrent(channel)
+
+        await self.recallConf(conf)
+        await self.setVoltage(channel, volt * 1000)
+        await self.setCurrent(channel, curr * 1000)
+        await self.saveConf(conf)
+
+    async def recallConf(self, conf):
+        """
+            Load existing configuration in Memory
+
+            :param conf: Memory index to recall
+            :type conf: int
+        """
+        self.limits.checkConf(conf)
+        await self._sendCommand("RCL{}".format(conf), wait=self.limits.MEMORY_SETTLE_TIME)
+
+    async def setOCP(self, enable=True):
+        """
+            :param enable: Boolean to enable or disable OCP
+            :type enable: boolean
+            :raises NotImplementedError: If the model doesn't support OCP
+        """
+        if not self.limits._CMD_OCP:
+            raise NotImplementedError("This model does not support OCP")
+        await self._sendCommand(self.limits._CMD_OCP[bool(enable)])
+
+    async def setOVP(self, enable=True):
+        """
+            :param enable: Boolean to enable or disable OVP
+            :type enable: boolean
+            :raises NotImplementedError: If the model doesn't support OVP
+        """
+        if not self.limits._CMD_OVP:
+            raise NotImplementedError("This model does not support OVP")
+        await self._sendCommand(self.limits._CMD_OVP[bool(enable)])
+
+    async def setBEEP(self, enable=True):
+        """
+            :param enable: Boolean to enable or disable BEEP
+            :type enable: boolean
+        """
+        await self._sendCommand(self.limits._CMD_BEEP[bool(enable)])
+
+    async def ON(self):
+        """
+            Turns on the output
+        """
+        await self._sendCommand(self.limits._CMD_ON)
+
+    async def OFF(self):
+        """
+            Turns off the output
+        """
+        await self._sendCommand(self.limits._CMD_OFF)
@@ -84,43 +84,39 @@ def main():
             T.OFF()  # Turn off for safety
             T.recallConf(args["save"])
 
-        # Now, with memory, or no memory handling, perform the changes
-        if args["ocp"] is not None:
-            if VERB:
+        # Now, with memory, or no memory handling, perform the changes.
+        # They are validated together and sent in one go
+        if VERB:
+            if args["ocp"] is not None:
                 if args["ocp"]:
                     print("Enable overcurrent protection")
                 else:
                     print("Disable overcurrent protection")
 
-            T.setOCP(args["ocp"])
-
-        if args["ovp"] is not None:
-            if VERB:
+            if args["ovp"] is not None:
                 if args["ovp"]:
                     print("Enable overvoltage protection")
                 else:
                     print("Disable overvoltage protection")
 
-            T.setOVP(args["ovp"])
-
-        if args["beep"] is not None:
-            if VERB:
+            if args["beep"] is not None:
                 if args["beep"]:
                     print("Enable unit beep")
                 else:
                     print("Disable unit beep")
 
-            T.setBEEP(args["beep"])
-
-        if args["voltage"]:
-            if VERB:
+            if args["voltage"]:
                 print("Setting voltage to ", args["voltage"])
-            T.setVoltage(args["channel"], args["voltage"])
 
-        if args["current"]:
-            if VERB:
+            if args["current"]:
                 print("Setting current to ", args["current"])
-            T.setCurrent(args["channel"], args["current"])
+
+        T.applyChannelConfig(args["channel"],
+                             mV=args["voltage"] or None,
+                             mA=args["current"] or None,
+                             ocp=args["ocp"],
+                             ovp=args["ovp"],
+                             beep=args["beep"])
 
         if args["save"]:
             if VERB:
@@ -36,7 +36,10 @@
     they use the same serial protocol.
 """
 
+import functools
+import inspect
 import time
+from types import MappingProxyType
 
 import serial
 
@@ -45,30 +48,89 @@ class TenmaException(Exception):
     pass
 
 
-def instantiate_tenma_class_from_device_response(device, debug=False):
+def instantiate_tenma_class_from_device_response(device, debug=False, lowLatency=True,
+                                                  cacheSettings=False):
     """
         Get a proper Tenma subclass depending on the version
         response from the unit.
 
         The subclasses mainly deal with the limit checks for each
         unit.
+
+        The detected model is remembered per device, so instantiating the
+        same device again skips the version handshake. Call
+        forgetDetectedModel() after connecting a different unit to it.
     """
+    cls = _IDENT_CACHE.get(device)
+    if cls is not None:
+        try:
+            return cls(device, debug=debug, lowLatency=lowLatency,
+                       cacheSettings=cacheSettings)
+        except serial.SerialException:
+            forgetDetectedModel(device)
+            raise
+
     # First instantiate base to retrieve version
-    powerSupply = Tenma72Base(device, debug=debug)
-    ver = powerSupply.getVersion()
+    powerSupply = Tenma72Base(device, debug=debug, lowLatency=lowLatency,
+                              cacheSettings=cacheSettings)
+    ver = powerSupply.getVersionBytes()
     if not ver:
         if debug:
             print("No version found, retrying with newline EOL")
-        ver = powerSupply.getVersion(serialEol="\n")
-    powerSupply.close()
+        ver = powerSupply.getVersionBytes(serialEol="\n")
+
+    cls = _modelForVersion(ver)
+    if cls is None:
+        print("Could not detect Tenma power supply model, assuming 72_2545")
+        cls = Tenma72_2545
+    else:
+        _IDENT_CACHE[device] = cls
+
+    # All Tenma72Base subclasses share its state, so keep the port open and
+    # hand the state over instead of opening the port a second time
+    detected = cls.__new__(cls)
+    for name in Tenma72Base.__slots__:
+        setattr(detected, name, getattr(powerSupply, name))
+    detected.serialHandler.setSerialEol(cls.SERIAL_EOL)
+    return detected
+
+
+def forgetDetectedModel(device=None):
+    """
+        Forgets the model remembered for device, or for all devices, so the
+        next instantiate_tenma_class_from_device_response() asks the unit
+        for its version again
+
+        :param device: COM/tty device, defaults to all devices
+        :type device: string
+    """
+    if device is None:
+        _IDENT_CACHE.clear()
+    else:
+        _IDENT_CACHE.pop(device, None)
+
+
+def _modelForVersion(ver):
+    """
+        Looks up the model class for a version reply
 
-    for cls in findSubclassesRecursively(Tenma72Base):
-        for matchString in cls.MATCH_STR:
-            if matchString in ver:
-                return cls(device, debug=debug)
+        The model is usually a word of its own in the reply (TENMA 72-2540
+        V2.1), which the dispatch dict finds directly. Replies with the model
+        glued to other fields fall back to a substring scan.
 
-    print("Could not detect Tenma power supply model, assuming 72_2545")
-    return Tenma72_2545(device, debug=debug)
+        :param ver: Version reply of the unit
+        :type ver: bytes
+        :return: The matching Tenma72Base subclass, None if unknown
+    """
+    for word in ver.split():
+        cls = _MODEL_DISPATCH.get(word)
+        if cls is not None:
+            return cls
+
+    for matchString, cls in _MODEL_TABLE:
+        if matchString in ver:
+            return cls
+    return None
 
 
 def findSubclassesRecursively(cls):
@@ -76,32 +138,322 @@ def findSubclassesRecursively(cls):
         Finds all subclasses of a given class recursively
     """
     all_subclasses = []
-    for subclass in cls.__subclasses__():
+    # Walk with an explicit stack, reversed so the order (depth first,
+    # parents before children) is the same as the recursive walk
+    stack = cls.__subclasses__()[::-1]
+    while stack:
+        subclass = stack.pop()
         all_subclasses.append(subclass)
-        all_subclasses.extend(findSubclassesRecursively(subclass))
+        stack.extend(subclass.__subclasses__()[::-1])
     return all_subclasses
 
 
+def _milliSplit(milli):
+    """
+        Splits a value in milli units (mV, mA) into units and thousandths,
+        to fill "%d.%03d" command templates without going through a float.
+
+        :param milli: Value in milli units
+        :type milli: int
+        :raises TenmaException: If the value is negative, which the unit
+                                doesn't take (and "-0.100" has no "%d.%03d" form)
+        :return: e.g. (1, 500) for 1500
+    """
+    milli = int(round(milli))
+    if milli < 0:
+        raise TenmaException("Negative value {}m can't be sent to the unit".format(milli))
+    return divmod(milli, 1000)
+
+
+def _milliToFixed(milli, decimals):
+    """
+        Formats a value in milli units (mV, mA) as a fixed point string in
+        units (V, A), with integer arithmetic only.
+
+        :param milli: Value in milli units
+        :type milli: int
+        :param decimals: Number of decimals to keep (1-3), rounded half up
+        :type decimals: int
+        :return: e.g. "5.000" for 5000 with 3 decimals
+    """
+    value = int(round(milli))
+    if decimals < 3:
+        scale = 10 ** (3 - decimals)
+        value = (value + scale // 2) // scale
+    units, fraction = divmod(value, 10 ** decimals)
+    return "{}.{:0{width}d}".format(units, fraction, width=decimals)
+
+
+def _verifyReadback(milli, read, unit):
+    """
+        Checks a value read back from the unit against the value that was set
+
+        :param milli: Value that was set, in milli units
+        :type milli: int or float
+        :param read: Value read back, in units
+        :type read: float
+        :param unit: "V" or "A", for the error message
+        :type unit: string
+        :raises TenmaException: If the values don't match
+        :return: The value read back as a float
+    """
+    # Round both, as e.g. 1.005 * 1000 is 1004.999... and callers like
+    # saveConfFlow pass such products as the value that was set
+    setMilli = int(round(milli))
+    readMilli = int(round(read * 1000))
+    if readMilli != setMilli:
+        raise TenmaException("Set {milli}m{unit}, but read {readMilli}m{unit}".format(
+            milli=setMilli,
+            readMilli=readMilli,
+            unit=unit
+        ))
+    return float(read)
+
+
+def _decodeStatus72(status):
+    """
+        Decodes a 72-XXXX status byte into a dictionary of values.
+        See Tenma72Base.getStatus
+    """
+    ch1mode = (status & 0x01)
+    ch2mode = (status & 0x02)
+    tracking = (status & 0x0C) >> 2
+    beep = (status & 0x10)
+    lock = (status & 0x20)
+    out = (status & 0x40)
+
+    if tracking == 0:
+        tracking = "Independent"
+    elif tracking == 1:
+        tracking = "Tracking Series"
+    elif tracking == 3:
+        tracking = "Tracking Parallel"
+    else:
+        tracking = "Unknown"
+
+    return {
+        "ch1Mode": "C.V" if ch1mode else "C.C",
+        "ch2Mode": "C.V" if ch2mode else "C.C",
+        "Tracking": tracking,
+        "BeepEnabled": bool(beep),
+        "lockEnabled": bool(lock),
+        "outEnabled": bool(out)
+    }
+
+
+def _decodeStatus72_13320(status):
+    """
+        Decodes a 72-13320/72-13330 status byte into a dictionary of values.
+        See Tenma72_13320.getStatus
+    """
+    ch1mode = (status & 0x01)
+    ch2mode = (status & 0x02)
+    tracking = (status & 0x0C) >> 2
+    out1 = (status & 0x40)
+    out2 = (status & 0x80)
+
+    if tracking == 0:
+        tracking = "Independent"
+    elif tracking == 1:
+        tracking = "Tracking Series"
+    elif tracking == 2:
+        tracking = "Tracking Parallel"
+    else:
+        tracking = "Unknown"
+
+    return {
+        "ch1Mode": "C.V" if ch1mode else "C.C",
+        "ch2Mode": "C.V" if ch2mode else "C.C",
+        "Tracking": tracking,
+        "out1Enabled": bool(out1),
+        "out2Enabled": bool(out2)
+    }
+
+
+def _decodeStatus72_13360(status):
+    """
+        Decodes a 72-13360 status byte into a dictionary of values.
+
+        :param status: Status byte as an integer
+        :type status: int
+        :return: Dictionary of status values
+    """
+    ch1mode = (status & 0b00000001)
+    output = (status & 0b00000010)
+    current_priority = (status & 0b00000100)
+    beep = (status & 0b00010000)
+    lock = (status & 0b00100000)
+
+    return {
+        "channelMode ": "C.V" if ch1mode else "C.C",
+        "output ": "ON" if output else "OFF",
+        "V/C priority ": "Current priority" if current_priority else "Voltage priority",
+        "beep ": "ON" if beep else "OFF",
+        "lock ": "ON" if lock else "OFF",
+    }
+
+
+def _raiseChannelError(channel, nchannels):
+    raise TenmaException(
+        "Channel CH{channel} not in range ({nch} channels supported)".format(
+            channel=channel,
+            nch=nchannels))
+
+
+def _raiseLimitError(channel, quantity, value, unit, maximum):
+    raise TenmaException(
+        "Trying to set CH{channel} {quantity} to {value}{unit}, the maximum is {max}{unit}".format(
+            channel=channel,
+            quantity=quantity,
+            value=value,
+            unit=unit,
+            max=maximum))
+
+
+def _makeChannelCheck(nchannels):
+    """
+        :return: A checkChannel method with the channel count baked in
+    """
+    def checkChannel(self, channel):
+        channel = int(channel)
+        if not 1 <= channel <= nchannels:
+            _raiseChannelError(channel, nchannels)
+    return checkChannel
+
+
+def _makeRangeCheck(maximum, quantity, unit):
+    """
+        :return: A checkVoltage/checkCurrent method with the maximum baked in
+    """
+    def check(self, channel, value):
+        value = int(value)
+        if not 0 <= value <= maximum:
+            _raiseLimitError(channel, quantity, value, unit, maximum)
+    return check
+
+
+def _idempotent(nkeys):
+    """
+        Decorates a setter so that, on instances with cacheSettings enabled,
+        repeating the last successful call with the same value skips the
+        serial write and returns the result of that call. A call asking to
+        verify is only skipped if the remembered call was verified too.
+
+        :param nkeys: How many arguments (after self) tell which setting is
+                      changed, e.g. 1 for the channel of setVoltage. The one
+                      after them is the value, later ones (verify) are not
+                      part of the key
+        :type nkeys: int
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def setter(self, *args, **kwargs):
+            if not self.cacheSettings:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            values = tuple(bound.arguments.values())
+            key = (method.__name__,) + values[1:nkeys + 1]
+            value = values[nkeys + 1]
+            verify = bound.arguments.get("verify", True)
+
+            last = self._last.get(key)
+            if last is not None and last[0] == value and (last[1] or not verify):
+                return last[2]
+            self._last.pop(key, None)
+            result = method(self, *args, **kwargs)
+            self._last[key] = (value, verify, result)
+            return result
+        return setter
+    return decorator
+
+
+def _invalidatesSettings(method):
+    """
+        Decorates a method that changes settings behind the cached setters'
+        back (memory recall, stepping, a new port), so the cache is dropped
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.invalidateCache()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TenmaSerialHandler(object):
     """
     A small class that handles serial communication for tenma power supplies.
     """
-
-    def __init__(self, serialPort, serialEOL, debug=False):
+    __slots__ = ("lowLatency", "_nextWrite", "ser", "SERIAL_EOL", "_EOL_BYTES", "DEBUG")
+
+    #: Seconds to wait for a reply. Reads return as soon as the reply is
+    #: complete, so this only costs time when the unit doesn't answer
+    TIMEOUT = 0.5
+    #: Seconds of silence that end a reply of unknown length on units without
+    #: EOL. Sized for USB-serial adapter latency (16ms timer on FTDI) rather
+    #: than byte time, so a reply held in the adapter isn't cut short
+    INTER_BYTE_TIMEOUT = 0.04
+    #: Seconds of silence units without an EOL need to tell two commands apart
+    COMMAND_GAP = 0.005
+    #: Seconds per byte on the wire at 9600 8N1
+    BYTE_TIME = 10 / 9600.0
+
+    def __init__(self, serialPort, serialEOL, debug=False, lowLatency=True):
         """
             :param serialPort: COM/tty device
             :type serialPort: string
             :param serialEOL: COM/tty device
             :type serialPort: string
+            :param lowLatency: Put the port in low latency mode if supported, defaults to True
+            :type lowLatency: boolean
         """
-        self.ser = serial.Serial(port=serialPort,
-                                 baudrate=9600,
-                                 parity=serial.PARITY_NONE,
-                                 stopbits=serial.STOPBITS_ONE)
-        self.SERIAL_EOL = serialEOL
+        self.lowLatency = lowLatency
+        self._nextWrite = 0.0
+        self.ser = self._openPort(serialPort)
+        self.setSerialEol(serialEOL)
 
         self.DEBUG = debug
 
+    def setSerialEol(self, serialEOL):
+        """
+            Sets the end of line terminator appended to every command
+
+            :param serialEOL: End of line terminator
+            :type serialEOL: string
+        """
+        self.SERIAL_EOL = serialEOL
+        self._EOL_BYTES = serialEOL.encode("ascii")
+
+    def _openPort(self, serialPort):
+        """
+            Opens the serial port, in low latency mode when requested
+
+            Low latency mode drops the USB-serial latency timer (16ms by
+            default on FTDI adapters) which otherwise dominates every
+            command/reply round trip.
+
+            :param serialPort: COM/tty device
+            :type serialPort: string
+            :return: The opened serial port
+        """
+        ser = serial.Serial(port=serialPort,
+                            baudrate=9600,
+                            parity=serial.PARITY_NONE,
+                            stopbits=serial.STOPBITS_ONE,
+                            timeout=self.TIMEOUT,
+                            write_timeout=0.2)
+        if self.lowLatency:
+            try:
+                ser.set_low_latency_mode(True)
+            except (NotImplementedError, OSError, AttributeError, ValueError):
+                # Not every platform or adapter supports it. pyserial reports
+                # a failed ioctl (e.g. on ptys) as ValueError on Linux
+                pass
+        return ser
+
     def setPort(self, serialPort):
         """
             Sets up the serial port with a new COM/tty device
@@ -109,49 +461,170 @@ class TenmaSerialHandler(object):
             :param serialPort: COM/tty device
             :type serialPort: string
         """
-        self.ser = serial.Serial(port=serialPort,
-                                 baudrate=9600,
-                                 parity=serial.PARITY_NONE,
-                                 stopbits=serial.STOPBITS_ONE)
+        self.ser = self._openPort(serialPort)
 
-    def _sendCommand(self, command):
+    def _sendCommand(self, command, wait=0.0):
         """
             Sends a command to the serial port of a power supply
 
+            Fixed commands are kept pre-encoded as bytes, which are written
+            as they are. Strings are encoded to ASCII first.
+
             :param command: Command to send
-            :type command: string
+            :type command: bytes or string
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
+            :type wait: float
         """
+        if not isinstance(command, bytes):
+            command = command.encode("ascii")
         if self.DEBUG:
-            print(">> ", command.strip())
-        command = command + self.SERIAL_EOL
-        self.ser.write(command.encode("ascii"))
-        # Give it time to process
-        time.sleep(0.2)
+            print(">> ", command.decode("ascii").strip())
+        self._write(command + self._EOL_BYTES)
+        if wait:
+            time.sleep(wait)
+
+    def _sendCommands(self, commands, wait=0.0):
+        """
+            Sends several commands in a row
+
+            With an EOL the commands are joined into a single write. Units
+            without one need silence between commands, so there they are
+            sent one by one.
+
+            :param commands: Commands to send
+            :type commands: iterable of bytes or strings
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
+            :type wait: float
+        """
+        if not self._EOL_BYTES:
+            for command in commands:
+                self._sendCommand(command)
+        else:
+            data = b"".join(
+                (command if isinstance(command, bytes) else command.encode("ascii")) +
+                self._EOL_BYTES for command in commands)
+            if self.DEBUG:
+                print(">> ", data.decode("ascii").strip())
+            self._write(data)
+        if wait:
+            time.sleep(wait)
+
+    def _write(self, data):
+        """
+            Writes data to the serial port
+
+            Write-only commands don't sleep afterwards. Units without an EOL
+            only see where a command ends from the silence after it, so
+            instead the next write is held back until the previous command
+            left the wire plus COMMAND_GAP. A reply to a query proves the
+            command was taken, which clears the hold.
+
+            :param data: Encoded command, EOL included
+            :type data: bytes
+        """
+        if self._nextWrite:
+            delay = self._nextWrite - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._nextWrite = 0.0
+        self.ser.write(data)
+        if not self._EOL_BYTES:
+            self._nextWrite = (time.monotonic() + len(data) * self.BYTE_TIME +
+                               self.COMMAND_GAP)
+
+    def _read(self, size=None):
+        """
+            Waits for a reply and reads it
+
+            With a known reply length the read returns as soon as that many
+            bytes arrived. Otherwise the reply is read up to the EOL, and for
+            units without one, the input is drained for as long as the unit
+            keeps sending, INTER_BYTE_TIMEOUT of silence ending the reply.
+            The wait for the first byte is bounded by TIMEOUT.
+
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Bytes read as a bytearray
+        """
+        if size:
+            return bytearray(self.ser.read(size))
+        if self._EOL_BYTES:
+            return bytearray(self.ser.read_until(self._EOL_BYTES))
+
+        out = bytearray(self.ser.read(1))
+        while out:
+            waiting = self.ser.in_waiting
+            if not waiting:
+                # The rest of the reply might still be on the wire
+                time.sleep(self.INTER_BYTE_TIMEOUT)
+                waiting = self.ser.in_waiting
+                if not waiting:
+                    break
+            out += self.ser.read(waiting)
+        return out
+
+    def _query(self, command, size=None):
+        """
+            Sends a command and reads the reply of the unit
 
-    def _readBytes(self):
+            Leftovers from an earlier reply (e.g. the extra byte some units
+            append to a reading) are discarded first, so they can't be taken
+            as part of this reply.
+
+            :param command: Command to send
+            :type command: bytes or string
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Reply read as a string
+        """
+        self.ser.reset_input_buffer()
+        self._sendCommand(command)
+        out = self._readOutput(size)
+        if out:
+            self._nextWrite = 0.0
+        return out
+
+    def _queryRaw(self, data, size=None):
+        """
+            Sends a command and reads the reply of the unit as bytes
+
+            :param data: Command to send
+            :type data: bytes or string
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Reply read as a bytearray
+        """
+        self.ser.reset_input_buffer()
+        self._sendCommand(data)
+        out = self._readBytes(size)
+        if out:
+            self._nextWrite = 0.0
+        return out
+
+    def _readBytes(self, size=None):
         """
             Read serial output as a stream of bytes
 
-            :return: Bytes read as a list of integers
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Bytes read as a bytearray (indexable as integers)
         """
-        out = []
-        while self.ser.inWaiting() > 0:
-            out.append(ord(self.ser.read(1)))
+        out = self._read(size)
 
         if self.DEBUG:
             print("<< ", ["0x{:02x}".format(v) for v in out])
 
         return out
 
-    def _readOutput(self):
+    def _readOutput(self, size=None):
         """
             Read serial otput as a string
 
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
             :return: Data read as a string
         """
-        out = ""
-        while self.ser.inWaiting() > 0:
-            out += self.ser.read(1).decode("ascii")
+        out = self._read(size).decode("ascii")
 
         if self.DEBUG:
             print("<< ", out.strip())
@@ -172,20 +645,88 @@ class Tenma72Base(object):
         Defaults in this class assume a 72-2540, use
         subclasses for other models
     """
+    # Instance state. Subclasses declare empty __slots__, so no instance
+    # carries a __dict__
+    __slots__ = ("serialHandler", "DEBUG", "cacheSettings", "_last")
+
     MATCH_STR = [""]
+    SERIAL_EOL = ""
 
     # 72Base sets some defaults. Subclasses should define
-    # custom limits
+    # custom limits. The hot read/set methods compare against these
+    # inline and only call the check* methods (which raise) when out of range
     NCHANNELS = 1
     NCONFS = 5
     MAX_MA = 5000
     MAX_MV = 30000
 
-    def __init__(self, serialPort, debug=False):
-        SERIAL_EOL = ""
-        self.serialHandler = TenmaSerialHandler(serialPort, SERIAL_EOL, debug=debug)
+    # Memory save/recall are the only commands that need the unit to settle
+    # before the next one is sent
+    MEMORY_SETTLE_TIME = 0.2
+
+    # Fixed commands, encoded once
+    _CMD_STATUS = b"STATUS?"
+    _CMD_ON = b"OUT1"
+    _CMD_OFF = b"OUT0"
+    # (disable, enable) pairs, indexed by bool(enable)
+    _CMD_OCP = (b"OCP0", b"OCP1")
+    _CMD_OVP = (b"OVP0", b"OVP1")
+    _CMD_BEEP = (b"BEEP0", b"BEEP1")
+
+    # There are only 256 possible status bytes, decode them all up front.
+    # Entries are read-only views since they are shared by every instance
+    _STATUS_TABLE = tuple(MappingProxyType(_decodeStatus72(status)) for status in range(256))
+
+    # Reply lengths in bytes, so reads return as soon as the reply is in.
+    # None reads up to the EOL (or all that arrives, on units without one)
+    _STATUS_REPLY_LEN = 1
+    _READING_REPLY_LEN = 5
+
+    def __init_subclass__(cls, **kwargs):
+        """
+            Gives every model checkChannel/checkVoltage/checkCurrent methods
+            with its limits baked in as constants, unless it defines its own.
+            Limits are read when the class is created.
+        """
+        super().__init_subclass__(**kwargs)
+        for name, check in (
+                ("checkChannel", _makeChannelCheck(cls.NCHANNELS)),
+                ("checkVoltage", _makeRangeCheck(cls.MAX_MV, "voltage", "mV")),
+                ("checkCurrent", _makeRangeCheck(cls.MAX_MA, "current", "mA"))):
+            if name not in cls.__dict__:
+                check.__name__ = name
+                check.__qualname__ = cls.__qualname__ + "." + name
+                check.__doc__ = getattr(Tenma72Base, name).__doc__
+                setattr(cls, name, check)
+
+    def __init__(self, serialPort, debug=False, lowLatency=True, cacheSettings=False):
+        """
+            :param serialPort: COM/tty device
+            :type serialPort: string
+            :param debug: Print the serial traffic, defaults to False
+            :type debug: boolean
+            :param lowLatency: Put the port in low latency mode if supported, defaults to True
+            :type lowLatency: boolean
+            :param cacheSettings: Skip setter calls (voltage, current, OCP, ...) that
+                                  repeat the last value sent. Only safe while nothing
+                                  else (e.g. the front panel) changes the unit, defaults to False
+            :type cacheSettings: boolean
+        """
+        self.serialHandler = TenmaSerialHandler(serialPort, self.SERIAL_EOL, debug=debug,
+                                                lowLatency=lowLatency)
         self.DEBUG = debug
+        self.cacheSettings = cacheSettings
+        self._last = {}
 
+    def invalidateCache(self):
+        """
+            Forgets the settings remembered with cacheSettings, so the next
+            setter calls are all sent. Call this after changing the unit by
+            other means, e.g. from its front panel.
+        """
+        self._last.clear()
+
+    @_invalidatesSettings
     def setPort(self, serialPort):
         """
             Sets up the serial port with a new COM/tty device
@@ -195,30 +736,61 @@ class Tenma72Base(object):
         """
         self.serialHandler.setPort(serialPort)
 
-    def _sendCommand(self, command):
+    def _sendCommand(self, command, wait=0.0):
         """
             Sends a command to the serial port of a power supply
 
             :param command: Command to send
-            :type command: Command to send
+            :type command: bytes or string
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
+            :type wait: float
+        """
+        self.serialHandler._sendCommand(command, wait=wait)
+
+    def _sendCommands(self, commands, wait=0.0):
+        """
+            Sends several commands in a row, in a single write where the unit allows it
+
+            :param commands: Commands to send
+            :type commands: iterable of bytes or strings
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
+            :type wait: float
         """
-        self.serialHandler._sendCommand(command)
+        self.serialHandler._sendCommands(commands, wait=wait)
 
-    def _readBytes(self):
+    def _readBytes(self, size=None):
         """
             Read serial output as a stream of bytes
 
-            :return: Bytes read as a list of integers
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Bytes read as a bytearray (indexable as integers)
         """
-        return self.serialHandler._readBytes()
+        return self.serialHandler._readBytes(size)
 
-    def __readOutput(self):
+    def _query(self, command, size=None):
         """
-            Read serial otput as a string
+            Sends a command and reads the reply of the unit
 
-            :return: Data read as a string
+            :param command: Command to send
+            :type command: bytes or string
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Reply read as a string
+        """
+        return self.serialHandler._query(command, size)
+
+    def _queryRaw(self, data, size=None):
         """
-        return self.serialHandler._readOutput()
+            Sends a command and reads the reply of the unit as bytes
+
+            :param data: Command to send
+            :type data: bytes or string
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :type size: int
+            :return: Reply read as a bytearray
+        """
+        return self.serialHandler._queryRaw(data, size)
 
     def close(self):
         """
@@ -236,10 +808,7 @@ class Tenma72Base(object):
         """
         channel = int(channel)
         if channel > self.NCHANNELS or channel < 1:
-            raise TenmaException(
-                "Channel CH{channel} not in range ({nch} channels supported)".format(
-                    channel=channel,
-                    nch=self.NCHANNELS))
+            _raiseChannelError(channel, self.NCHANNELS)
 
     def checkVoltage(self, channel, mV):
         """
@@ -253,11 +822,7 @@ class Tenma72Base(object):
         """
         mV = int(mV)
         if mV > self.MAX_MV or mV < 0:
-            raise TenmaException(
-                "Trying to set CH{channel} voltage to {mv}mV, the maximum is {max}mV".format(
-                    channel=channel,
-                    mv=mV,
-                    max=self.MAX_MV))
+            _raiseLimitError(channel, "voltage", mV, "mV", self.MAX_MV)
 
     def checkCurrent(self, channel, mA):
         """
@@ -271,11 +836,7 @@ class Tenma72Base(object):
         """
         mA = int(mA)
         if mA > self.MAX_MA or mA < 0:
-            raise TenmaException(
-                "Trying to set CH{channel} current to {ma}mA, the maximum is {max}mA".format(
-                    channel=channel,
-                    ma=mA,
-                    max=self.MAX_MA))
+            _raiseLimitError(channel, "current", mA, "mA", self.MAX_MA)
 
     def checkConf(self, conf):
         """
@@ -304,8 +865,17 @@ class Tenma72Base(object):
             :type serialEol: string
             :return: The version string from the power supply
         """
-        self._sendCommand("*IDN?{}".format(serialEol))
-        return self.__readOutput()
+        return self.getVersionBytes(serialEol).decode("ascii")
+
+    def getVersionBytes(self, serialEol=""):
+        """
+            Returns the raw version reply of the Tenma Device, undecoded
+
+            :param serialEol: End of line terminator, defaults to ""
+            :type serialEol: string
+            :return: The version reply from the power supply as bytes
+        """
+        return bytes(self._queryRaw(b"*IDN?" + serialEol.encode("ascii")))
 
     def getStatus(self):
         """
@@ -323,35 +893,10 @@ class Tenma72Base(object):
 
             :return: Dictionary of status values
         """
-        self._sendCommand("STATUS?")
-        statusBytes = self._readBytes()
+        statusBytes = self._queryRaw(self._CMD_STATUS, self._STATUS_REPLY_LEN)
 
-        status = statusBytes[0]
-
-        ch1mode = (status & 0x01)
-        ch2mode = (status & 0x02)
-        tracking = (status & 0x0C) >> 2
-        beep = (status & 0x10)
-        lock = (status & 0x20)
-        out = (status & 0x40)
-
-        if tracking == 0:
-            tracking = "Independent"
-        elif tracking == 1:
-            tracking = "Tracking Series"
-        elif tracking == 3:
-            tracking = "Tracking Parallel"
-        else:
-            tracking = "Unknown"
-
-        return {
-            "ch1Mode": "C.V" if ch1mode else "C.C",
-            "ch2Mode": "C.V" if ch2mode else "C.C",
-            "Tracking": tracking,
-            "BeepEnabled": bool(beep),
-            "lockEnabled": bool(lock),
-            "outEnabled": bool(out)
-        }
+        # Hand out a plain dict, as callers expect a mutable one
+        return dict(self._STATUS_TABLE[statusBytes[0]])
 
     def readCurrent(self, channel):
         """
@@ -360,13 +905,15 @@ class Tenma72Base(object):
             :param channel: Channel to read the current of
             :return: Current for the channel in Amps as a float
         """
-        self.checkChannel(channel)
+        channel = int(channel)
+        if not 1 <= channel <= self.NCHANNELS:
+            self.checkChannel(channel)
         commandCheck = "ISET{}?".format(channel)
-        self._sendCommand(commandCheck)
         # 72-2550 appends sixth byte from *IDN? to current reading due to firmware bug
-        return float(self.__readOutput()[:5])
+        return float(self._query(commandCheck, self._READING_REPLY_LEN)[:5])
 
-    def setCurrent(self, channel, mA):
+    @_idempotent(1)
+    def setCurrent(self, channel, mA, verify=True):
         """
             Sets the current of the specified channel
 
@@ -374,25 +921,40 @@ class Tenma72Base(object):
             :type channel: int
             :param mA: Current to set the channel to, in mA
             :type mA: int
+            :param verify: Read the current back to check it was set, defaults to True
+            :type verify: boolean
             :raises TenmaException: If the current does not match what was set
             :return: The current the channel was set to in Amps as a float
         """
+        self._sendCommand(self._currentCommand(channel, mA))
+        if not verify:
+            return mA / 1000.0
+
+        return _verifyReadback(mA, self.readCurrent(channel), "A")
+
+    def _checkCurrentChannel(self, channel):
+        """
+            Checks that the current of the given channel can be read
+
+            :raises TenmaException: If the channel is invalid
+        """
         self.checkChannel(channel)
-        self.checkCurrent(channel, mA)
 
-        A = float(mA) / 1000.0
-        command = "ISET{channel}:{amperes:.3f}".format(channel=channel, amperes=A)
+    def _currentCommand(self, channel, mA):
+        """
+            Validates a current setting and builds the command setting it
 
-        self._sendCommand(command)
-        readcurrent = self.readCurrent(channel)
-        readMilliamps = int(readcurrent * 1000)
+            :raises TenmaException: If the channel or current is invalid
+            :return: The ISET command
+        """
+        channel = int(channel)
+        if not 1 <= channel <= self.NCHANNELS:
+            self.checkChannel(channel)
+        if not 0 <= mA <= self.MAX_MA:
+            self.checkCurrent(channel, mA)
 
-        if readMilliamps != mA:
-            raise TenmaException("Set {mA}mA, but read {readMilliamps}mA".format(
-                mA=mA,
-                readMilliamps=readMilliamps
-            ))
-        return float(readcurrent)
+        return "ISET{channel}:{amperes}".format(channel=channel,
+                                                amperes=_milliToFixed(mA, 3))
 
     def readVoltage(self, channel):
         """
@@ -402,13 +964,15 @@ class Tenma72Base(object):
             :type channel: int
             :return: Voltage for the channel in Volts as a float
         """
-        self.checkChannel(channel)
+        channel = int(channel)
+        if not 1 <= channel <= self.NCHANNELS:
+            self.checkChannel(channel)
 
         commandCheck = "VSET{}?".format(channel)
-        self._sendCommand(commandCheck)
-        return float(self.__readOutput())
+        return float(self._query(commandCheck, self._READING_REPLY_LEN))
 
-    def setVoltage(self, channel, mV):
+    @_idempotent(1)
+    def setVoltage(self, channel, mV, verify=True):
         """
             Sets the voltage of the specified channel
 
@@ -416,25 +980,83 @@ class Tenma72Base(object):
             :type channel: int
             :param mV: voltage to set the channel to, in mV
             :type mV: int
+            :param verify: Read the voltage back to check it was set, defaults to True
+            :type verify: boolean
             :raises TenmaException: If the voltage does not match what was set
             :return: The voltage the channel was set to in Volts as a float
         """
-        self.checkChannel(channel)
-        self.checkVoltage(channel, mV)
+        self._sendCommand(self._voltageCommand(channel, mV))
+        if not verify:
+            return mV / 1000.0
 
-        volts = float(mV) / 1000.0
-        command = "VSET{channel}:{volts:.2f}".format(channel=channel, volts=volts)
+        return _verifyReadback(mV, self.readVoltage(channel), "V")
 
-        self._sendCommand(command)
-        readVolts = self.readVoltage(channel)
-        readMillivolts = int(readVolts * 1000)
+    def _voltageCommand(self, channel, mV):
+        """
+            Validates a voltage setting and builds the command setting it
 
-        if readMillivolts != int(mV):
-            raise TenmaException("Set {mV}mV, but read {readMillivolts}mV".format(
-                mV=mV,
-                readMillivolts=readMillivolts
-            ))
-        return float(readVolts)
+            :raises TenmaException: If the channel or voltage is invalid
+            :return: The VSET command
+        """
+        channel = int(channel)
+        if not 1 <= channel <= self.NCHANNELS:
+            self.checkChannel(channel)
+        if not 0 <= mV <= self.MAX_MV:
+            self.checkVoltage(channel, mV)
+
+        return "VSET{channel}:{volts}".format(channel=channel, volts=_milliToFixed(mV, 2))
+
+    @_invalidatesSettings
+    def applyChannelConfig(self, channel, mV=None, mA=None, ocp=None, ovp=None,
+                           beep=None, verify=True):
+        """
+            Applies several settings at once
+
+            Everything is validated before anything is sent, then the commands
+            go out in a single write where the unit allows it. Settings left
+            as None are not changed.
+
+            :param channel: Channel to set the voltage and current of
+            :type channel: int
+            :param mV: Voltage to set, in mV
+            :type mV: int
+            :param mA: Current to set, in mA
+            :type mA: int
+            :param ocp: Enable or disable OCP
+            :type ocp: boolean
+            :param ovp: Enable or disable OVP
+            :type ovp: boolean
+            :param beep: Enable or disable the beep
+            :type beep: boolean
+            :param verify: Read voltage and current back to check they were set, defaults to True
+            :type verify: boolean
+            :raises TenmaException: If a setting is invalid, or does not match what was set
+            :raises NotImplementedError: If OCP or OVP is given to a model without it
+        """
+        commands = []
+        if ocp is not None:
+            if not self._CMD_OCP:
+                raise NotImplementedError("This model does not support OCP")
+            commands.append(self._CMD_OCP[bool(ocp)])
+        if ovp is not None:
+            if not self._CMD_OVP:
+                raise NotImplementedError("This model does not support OVP")
+            commands.append(self._CMD_OVP[bool(ovp)])
+        if beep is not None:
+            commands.append(self._CMD_BEEP[bool(beep)])
+        if mV is not None:
+            commands.append(self._voltageCommand(channel, mV))
+        if mA is not None:
+            commands.append(self._currentCommand(channel, mA))
+
+        if commands:
+            self._sendCommands(commands)
+
+        if verify:
+            if mV is not None:
+                _verifyReadback(mV, self.readVoltage(channel), "V")
+            if mA is not None:
+                _verifyReadback(mA, self.readCurrent(channel), "A")
 
     def runningCurrent(self, channel):
         """
@@ -444,11 +1066,12 @@ class Tenma72Base(object):
             :type channel: int
             :return: The running current of the channel in Amps as a float
         """
-        self.checkChannel(channel)
+        channel = int(channel)
+        if not 1 <= channel <= self.NCHANNELS:
+            self.checkChannel(channel)
 
         command = "IOUT{}?".format(channel)
-        self._sendCommand(command)
-        return float(self.__readOutput())
+        return float(self._query(command, self._READING_REPLY_LEN))
 
     def runningVoltage(self, channel):
         """
@@ -458,11 +1081,12 @@ class Tenma72Base(object):
             :type channel: int
             :return: The running voltage of the channel in volts as a float
         """
-        self.checkChannel(channel)
+        channel = int(channel)
+        if not 1 <= channel <= self.NCHANNELS:
+            self.checkChannel(channel)
 
         command = "VOUT{}?".format(channel)
-        self._sendCommand(command)
-        return float(self.__readOutput())
+        return float(self._query(command, self._READING_REPLY_LEN))
 
     def saveConf(self, conf):
         """
@@ -477,7 +1101,7 @@ class Tenma72Base(object):
         """
         self.checkConf(conf)
         command = "SAV{}".format(conf)
-        self._sendCommand(command)
+        self._sendCommand(command, wait=self.MEMORY_SETTLE_TIME)
 
     def saveConfFlow(self, conf, channel):
         """
@@ -518,6 +1142,7 @@ class Tenma72Base(object):
             print("Voltage:", volt)
             print("Current:", curr)
 
+    @_invalidatesSettings
     def recallConf(self, conf):
         """
             Load existing configuration in Memory. Same as pressing any Mx button on the unit
@@ -526,8 +1151,9 @@ class Tenma72Base(object):
             :type conf: int
         """
         self.checkConf(conf)
-        self._sendCommand("RCL{}".format(conf))
+        self._sendCommand("RCL{}".format(conf), wait=self.MEMORY_SETTLE_TIME)
 
+    @_idempotent(0)
     def setOCP(self, enable=True):
         """
             Enable or disable OCP.
@@ -538,10 +1164,9 @@ class Tenma72Base(object):
             :param enable: Boolean to enable or disable
             :type enable: boolean
         """
-        enableFlag = 1 if enable else 0
-        command = "OCP{}".format(enableFlag)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_OCP[bool(enable)])
 
+    @_idempotent(0)
     def setOVP(self, enable=True):
         """
             Enable or disable OVP
@@ -552,10 +1177,9 @@ class Tenma72Base(object):
             :param enable: Boolean to enable or disable
             :type enable: boolean
         """
-        enableFlag = 1 if enable else 0
-        command = "OVP{}".format(enableFlag)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_OVP[bool(enable)])
 
+    @_idempotent(0)
     def setBEEP(self, enable=True):
         """
             Enable or disable BEEP
@@ -566,23 +1190,19 @@ class Tenma72Base(object):
             :param enable: Boolean to enable or disable
             :type enable: boolean
         """
-        enableFlag = 1 if enable else 0
-        command = "BEEP{}".format(enableFlag)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_BEEP[bool(enable)])
 
     def ON(self):
         """
             Turns on the output
         """
-        command = "OUT1"
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_ON)
 
     def OFF(self):
         """
             Turns off the output
         """
-        command = "OUT0"
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_OFF)
 
     def setLock(self, enable=True):
         """
@@ -745,6 +1365,8 @@ class Tenma72Base(object):
 #
 #
 class Tenma72_2540(Tenma72Base):
+    __slots__ = ()
+
     MATCH_STR = ["72-2540"]
     #:
     NCHANNELS = 1
@@ -757,6 +1379,8 @@ class Tenma72_2540(Tenma72Base):
 
 
 class Tenma72_2535(Tenma72Base):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-2535"]
     #:
@@ -770,6 +1394,8 @@ class Tenma72_2535(Tenma72Base):
 
 
 class Tenma72_2545(Tenma72Base):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-2545"]
     #:
@@ -783,6 +1409,8 @@ class Tenma72_2545(Tenma72Base):
 
 
 class Tenma72_2550(Tenma72Base):
+    __slots__ = ()
+
     #: Tenma 72-2550 is also manufactured as Korad KA 6003P
     MATCH_STR = ["72-2550", "KORADKA6003P"]
     #:
@@ -796,6 +1424,8 @@ class Tenma72_2550(Tenma72Base):
 
 
 class Tenma72_2930(Tenma72Base):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-2930"]
     #:
@@ -809,6 +1439,8 @@ class Tenma72_2930(Tenma72Base):
 
 
 class Tenma72_2705(Tenma72Base):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-2705"]
     #:
@@ -822,6 +1454,8 @@ class Tenma72_2705(Tenma72Base):
 
 
 class Tenma72_2940(Tenma72Base):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-2940"]
     #:
@@ -835,6 +1469,8 @@ class Tenma72_2940(Tenma72Base):
 
 
 class Tenma72_13320(Tenma72Base):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-13320"]
     #:
@@ -845,11 +1481,34 @@ class Tenma72_13320(Tenma72Base):
     MAX_MA = 3000
     #:
     MAX_MV = 30000
-
-    def __init__(self, serialPort, debug=False):
-        SERIAL_EOL = "\n"
-        self.serialHandler = TenmaSerialHandler(serialPort, SERIAL_EOL, debug=debug)
-        self.DEBUG = debug
+    #:
+    SERIAL_EOL = "\n"
+
+    # Without a channel, ON/OFF switch both main outputs
+    _CMD_ON = b"OUT12:1"
+    _CMD_OFF = b"OUT12:0"
+    _CMD_LOCK = (b"LOCK0", b"LOCK1")
+    # No OCP/OVP on this model
+    _CMD_OCP = None
+    _CMD_OVP = None
+    # Step commands, filled in with the channel and values split by _milliSplit
+    _CMD_VSTEP = b"VSTEP%d:%d.%03d"
+    _CMD_ISTEP = b"ISTEP%d:%d.%03d"
+    _CMD_VUP = b"VUP%d"
+    _CMD_VDOWN = b"VDOWN%d"
+    _CMD_IUP = b"IUP%d"
+    _CMD_IDOWN = b"IDOWN%d"
+    _CMD_VASTEP = b"VASTEP%d:%d.%03d,%d.%03d,%d.%03d,%g"
+    _CMD_IASTEP = b"IASTEP%d:%d.%03d,%d.%03d,%d.%03d,%g"
+    _CMD_VASTOP = b"VASTOP%d"
+    _CMD_IASTOP = b"IASTOP%d"
+
+    _STATUS_TABLE = tuple(MappingProxyType(_decodeStatus72_13320(status))
+                          for status in range(256))
+
+    # The status byte is followed by '\n', readings are '\n' terminated
+    _STATUS_REPLY_LEN = 2
+    _READING_REPLY_LEN = None
 
     def getStatus(self):
         """
@@ -866,34 +1525,10 @@ class Tenma72_13320(Tenma72Base):
 
             :return: Dictionary of status values
         """
-        self._sendCommand("STATUS?")
-        statusBytes = self._readBytes()
+        statusBytes = self._queryRaw(self._CMD_STATUS, self._STATUS_REPLY_LEN)
 
         # 72-13330 sends two bytes back, the second being '\n'
-        status = statusBytes[0]
-
-        ch1mode = (status & 0x01)
-        ch2mode = (status & 0x02)
-        tracking = (status & 0x0C) >> 2
-        out1 = (status & 0x40)
-        out2 = (status & 0x80)
-
-        if tracking == 0:
-            tracking = "Independent"
-        elif tracking == 1:
-            tracking = "Tracking Series"
-        elif tracking == 2:
-            tracking = "Tracking Parallel"
-        else:
-            tracking = "Unknown"
-
-        return {
-            "ch1Mode": "C.V" if ch1mode else "C.C",
-            "ch2Mode": "C.V" if ch2mode else "C.C",
-            "Tracking": tracking,
-            "out1Enabled": bool(out1),
-            "out2Enabled": bool(out2)
-        }
+        return dict(self._STATUS_TABLE[statusBytes[0]])
 
     def readCurrent(self, channel):
         """
@@ -904,8 +1539,7 @@ class Tenma72_13320(Tenma72Base):
             :return: Current for the channel in Amps as a float
             :raises TenmaException: If trying to read the current of Channel 3
         """
-        if channel == 3:
-            raise TenmaException("Channel CH3 does not support reading current")
+        self._checkCurrentChannel(channel)
         return super().readCurrent(channel)
 
     def runningCurrent(self, channel):
@@ -918,11 +1552,21 @@ class Tenma72_13320(Tenma72Base):
 
             :raises TenmaException: If trying to read the current of Channel 3
         """
-        if channel == 3:
-            raise TenmaException("Channel CH3 does not support reading current")
+        self._checkCurrentChannel(channel)
         return super().runningCurrent(channel)
 
-    def setVoltage(self, channel, mV):
+    def _checkCurrentChannel(self, channel):
+        """
+            Checks that the current of the given channel can be read
+
+            :raises TenmaException: If the channel is invalid or CH3, which
+                                    can't read its current
+        """
+        if int(channel) == 3:
+            raise TenmaException("Channel CH3 does not support reading current")
+        self.checkChannel(channel)
+
+    def setVoltage(self, channel, mV, verify=True):
         """
             Sets the voltage of the specified channel
 
@@ -930,14 +1574,26 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
             :param mV: voltage to set the channel to, in mV
             :type mV: int
+            :param verify: Read the voltage back to check it was set, defaults to True
+            :type verify: boolean
             :return: The voltage the channel was set to in Volts as a float
 
             :raises TenmaException: If the voltage does not match what was set,
             or if trying to set an invalid voltage on Channel 3
         """
-        if channel == 3 and mV not in [2500, 3300, 5000]:
+        return super().setVoltage(channel, mV, verify=verify)
+
+    def _voltageCommand(self, channel, mV):
+        """
+            Validates a voltage setting and builds the command setting it
+
+            :raises TenmaException: If the voltage is invalid, or not one of
+                                    the fixed voltages of Channel 3
+            :return: The VSET command
+        """
+        if int(channel) == 3 and mV not in [2500, 3300, 5000]:
             raise TenmaException("Channel CH3 can only be set to 2500mV, 3300mV or 5000mV")
-        return super().setVoltage(channel, mV)
+        return super()._voltageCommand(channel, mV)
 
     def setOCP(self, enable=True):
         """
@@ -973,12 +1629,10 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         if channel is None:
-            command = "OUT12:1"
+            self._sendCommand(self._CMD_ON)
         else:
             self.checkChannel(channel)
-            command = "OUT{}:1".format(channel)
-
-        self._sendCommand(command)
+            self._sendCommand("OUT{}:1".format(channel))
 
     def OFF(self, channel=None):
         """
@@ -988,11 +1642,10 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         if channel is None:
-            command = "OUT12:0"
+            self._sendCommand(self._CMD_OFF)
         else:
             self.checkChannel(channel)
-            command = "OUT{}:0".format(channel)
-        self._sendCommand(command)
+            self._sendCommand("OUT{}:0".format(channel))
 
     def setLock(self, enable=True):
         """
@@ -1001,8 +1654,7 @@ class Tenma72_13320(Tenma72Base):
             :param enable: Enable lock, defaults to True
             :type enable: boolean
         """
-        enableFlag = 1 if enable else 0
-        self._sendCommand("LOCK{}".format(enableFlag))
+        self._sendCommand(self._CMD_LOCK[bool(enable)])
 
     def setTracking(self, trackingMode):
         """
@@ -1021,6 +1673,7 @@ class Tenma72_13320(Tenma72Base):
                  " 0 (Independent), 1 (Series), 2 (Parallel)").format(trackingMode))
         self._sendCommand("TRACK{}".format(trackingMode))
 
+    @_invalidatesSettings
     def startAutoVoltageStep(self, channel, startMillivolts,
                              stopMillivolts, stepMillivolts, stepTime):
         """
@@ -1050,18 +1703,12 @@ class Tenma72_13320(Tenma72Base):
                     stepMillivolts=stepMillivolts,
                     stopMillivolts=stopMillivolts))
 
-        startVolts = float(startMillivolts) / 1000.0
-        stopVolts = float(stopMillivolts) / 1000.0
-        stepVolts = float(stepMillivolts) / 1000.0
-
-        command = "VASTEP{channel}:{startVolts},{stopVolts},{stepVolts},{stepTime}".format(
-            channel=channel,
-            startVolts=startVolts,
-            stopVolts=stopVolts,
-            stepVolts=stepVolts,
-            stepTime=stepTime
-        )
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_VASTEP % (
+            channel,
+            *_milliSplit(startMillivolts),
+            *_milliSplit(stopMillivolts),
+            *_milliSplit(stepMillivolts),
+            stepTime))
 
     def stopAutoVoltageStep(self, channel):
         """
@@ -1071,8 +1718,9 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         self.checkChannel(channel)
-        self._sendCommand("VASTOP{}".format(channel))
+        self._sendCommand(self._CMD_VASTOP % channel)
 
+    @_invalidatesSettings
     def startAutoCurrentStep(self, channel, startMilliamps,
                              stopMilliamps, stepMilliamps, stepTime):
         """
@@ -1101,18 +1749,12 @@ class Tenma72_13320(Tenma72Base):
                     stepMilliamps=stepMilliamps,
                     stopMilliamps=stopMilliamps))
 
-        startAmps = float(startMilliamps) / 1000.0
-        stopAmps = float(stopMilliamps) / 1000.0
-        stepAmps = float(stepMilliamps) / 1000.0
-
-        command = "IASTEP{channel}:{startAmps},{stopAmps},{stepAmps},{stepTime}".format(
-            channel=channel,
-            startAmps=startAmps,
-            stopAmps=stopAmps,
-            stepAmps=stepAmps,
-            stepTime=stepTime
-        )
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_IASTEP % (
+            channel,
+            *_milliSplit(startMilliamps),
+            *_milliSplit(stopMilliamps),
+            *_milliSplit(stepMilliamps),
+            stepTime))
 
     def stopAutoCurrentStep(self, channel):
         """
@@ -1122,8 +1764,9 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         self.checkChannel(channel)
-        self._sendCommand("IASTOP{}".format(channel))
+        self._sendCommand(self._CMD_IASTOP % channel)
 
+    @_idempotent(1)
     def setManualVoltageStep(self, channel, stepMillivolts):
         """
             Sets the manual step voltage of the channel
@@ -1137,10 +1780,9 @@ class Tenma72_13320(Tenma72Base):
         """
         self.checkChannel(channel)
         self.checkVoltage(channel, stepMillivolts)
-        stepVolts = float(stepMillivolts) / 1000.0
-        command = "VSTEP{}:{}".format(channel, stepVolts)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_VSTEP % (channel, *_milliSplit(stepMillivolts)))
 
+    @_invalidatesSettings
     def stepVoltageUp(self, channel):
         """
             Increse the voltage by the configured step voltage on the specified channel
@@ -1150,8 +1792,9 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         self.checkChannel(channel)
-        self._sendCommand("VUP{}".format(channel))
+        self._sendCommand(self._CMD_VUP % channel)
 
+    @_invalidatesSettings
     def stepVoltageDown(self, channel):
         """
             Decrese the voltage by the configured step voltage on the specified channel
@@ -1161,8 +1804,9 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         self.checkChannel(channel)
-        self._sendCommand("VDOWN{}".format(channel))
+        self._sendCommand(self._CMD_VDOWN % channel)
 
+    @_idempotent(1)
     def setManualCurrentStep(self, channel, stepMilliamps):
         """
             Sets the manual step current of the channel
@@ -1176,10 +1820,9 @@ class Tenma72_13320(Tenma72Base):
         """
         self.checkChannel(channel)
         self.checkCurrent(channel, stepMilliamps)
-        stepAmps = float(stepMilliamps) / 1000.0
-        command = "ISTEP{}:{}".format(channel, stepAmps)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_ISTEP % (channel, *_milliSplit(stepMilliamps)))
 
+    @_invalidatesSettings
     def stepCurrentUp(self, channel):
         """
             Increse the current by the configured step current on the specified channel
@@ -1189,8 +1832,9 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         self.checkChannel(channel)
-        self._sendCommand("IUP{}".format(channel))
+        self._sendCommand(self._CMD_IUP % channel)
 
+    @_invalidatesSettings
     def stepCurrentDown(self, channel):
         """
             Decrese the current by the configured step current on the specified channel
@@ -1200,10 +1844,12 @@ class Tenma72_13320(Tenma72Base):
             :type channel: int
         """
         self.checkChannel(channel)
-        self._sendCommand("IDOWN{}".format(channel))
+        self._sendCommand(self._CMD_IDOWN % channel)
 
 
 class Tenma72_13330(Tenma72_13320):
+    __slots__ = ()
+
     #:
     MATCH_STR = ["72-13330"]
     #:
@@ -1226,15 +1872,35 @@ class Tenma72_13360_base(object):
         It also has other slight variations in protocol such as a ":" separator and the
         STATUS? command returning more general settings.
     """
+    __slots__ = ("serialHandler", "DEBUG")
 
     NCONFS = 5
     MAX_MA = 15000
     MAX_MV = 60000
     SERIAL_SETTER_SEPARATOR = ":"
-
-    def __init__(self, serialPort, debug=False):
-        SERIAL_EOL = "\n"
-        self.serialHandler = TenmaSerialHandler(serialPort, SERIAL_EOL, debug=debug)
+    SERIAL_EOL = "\n"
+    MEMORY_SETTLE_TIME = 0.2
+
+    # Fixed commands, encoded once
+    _CMD_STATUS = b"STATUS?"
+    _CMD_ON = b"OUT:1"
+    _CMD_OFF = b"OUT:0"
+    # (disable, enable) pairs, indexed by bool(enable)
+    _CMD_BEEP = (b"BEEP:0", b"BEEP:1")
+    _CMD_LOCK = (b"LOCK:0", b"LOCK:1")
+    # Step commands, filled in with values split by _milliSplit
+    _CMD_VSTEP = b"VSTEP:%d.%03d"
+    _CMD_ISTEP = b"ISTEP:%d.%03d"
+    _CMD_VASTEP = b"VASTEP:%d.%03d,%d.%03d,%d.%03d,%g"
+    _CMD_IASTEP = b"IASTEP:%d.%03d,%d.%03d,%d.%03d,%g"
+
+    # Decoded once per status byte, see Tenma72Base._STATUS_TABLE
+    _STATUS_TABLE = tuple(MappingProxyType(_decodeStatus72_13360(status))
+                          for status in range(256))
+
+    def __init__(self, serialPort, debug=False, lowLatency=True):
+        self.serialHandler = TenmaSerialHandler(serialPort, self.SERIAL_EOL, debug=debug,
+                                                lowLatency=lowLatency)
 
         self.DEBUG = debug
 
@@ -1246,29 +1912,52 @@ class Tenma72_13360_base(object):
         """
         self.serialHandler.setPort(serialPort)
 
-    def _sendCommand(self, command):
+    def _sendCommand(self, command, wait=0.0):
         """
             Sends a command to the serial port of a power supply
 
             :param command: Command to send
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
+        """
+        self.serialHandler._sendCommand(command, wait=wait)
+
+    def _sendCommands(self, commands, wait=0.0):
+        """
+            Sends several commands in a row, in a single write
+
+            :param commands: Commands to send
+            :param wait: Seconds to let the unit settle after sending, defaults to 0
         """
-        self.serialHandler._sendCommand(command)
+        self.serialHandler._sendCommands(commands, wait=wait)
 
-    def _readBytes(self):
+    def _readBytes(self, size=None):
         """
             Read serial output as a stream of bytes
 
-            :return: Bytes read as a list of integers
+            :param size: Expected reply length in bytes, defaults to None (unknown)
+            :return: Bytes read as a bytearray (indexable as integers)
         """
-        return self.serialHandler._readBytes()
+        return self.serialHandler._readBytes(size)
 
-    def __readOutput(self):
+    def _query(self, command, size=None):
         """
-            Read serial otput as a string
+            Sends a command and reads the reply of the unit
 
-            :return: Data read as a string
+            :param command: Command to send
+            :param size: Expected reply length in bytes, defaults to None (up to the EOL)
+            :return: Reply read as a string
+        """
+        return self.serialHandler._query(command, size)
+
+    def _queryRaw(self, data, size=None):
         """
-        return self.serialHandler._readOutput()
+            Sends a command and reads the reply of the unit as bytes
+
+            :param data: Command to send
+            :param size: Expected reply length in bytes, defaults to None (up to the EOL)
+            :return: Reply read as a bytearray
+        """
+        return self.serialHandler._queryRaw(data, size)
 
     def close(self):
         """
@@ -1311,8 +2000,7 @@ class Tenma72_13360_base(object):
             :param serialEol: End of line terminator, defaults to ""
             :return: The version string from the power supply
         """
-        self._sendCommand("*IDN?{}".format(serialEol))
-        return self.__readOutput()
+        return self._query("*IDN?{}".format(serialEol))
 
     def getStatus(self):
         """
@@ -1326,25 +2014,11 @@ class Tenma72_13360_base(object):
 
             :return: Dictionary of status values
         """
-        self._sendCommand("STATUS?")
-        statusBytes = self._readBytes()
+        # Fixed length, as the status byte itself may be 0x0A
+        statusBytes = self._queryRaw(self._CMD_STATUS, 2)
 
         # 72-13360 sends two bytes back, the second being '\n'
-        status = statusBytes[0]
-
-        ch1mode = (status & 0b00000001)
-        output = (status & 0b00000010)
-        current_priority = (status & 0b00000100)
-        beep = (status & 0b00010000)
-        lock = (status & 0b00100000)
-
-        return {
-            "channelMode ": "C.V" if ch1mode else "C.C",
-            "output ": "ON" if output else "OFF",
-            "V/C priority ": "Current priority" if current_priority else "Voltage priority",
-            "beep ": "ON" if beep else "OFF",
-            "lock ": "ON" if lock else "OFF",
-        }
+        return dict(self._STATUS_TABLE[statusBytes[0]])
 
     def readCurrent(self):
         """
@@ -1352,33 +2026,26 @@ class Tenma72_13360_base(object):
 
             :return: Current in Amps as a float
         """
-        commandCheck = "ISET?".format()
-        self._sendCommand(commandCheck)
-        return float(self.__readOutput()[:5])
+        return float(self._query(b"ISET?")[:5])
 
-    def setCurrent(self, mA):
+    def setCurrent(self, mA, verify=True):
         """
             Sets the current
 
             :param mA: Current to set the PSU to, in mA
+            :param verify: Read the current back to check it was set, defaults to True
             :raises TenmaException: If the current does not match what was set
             :return: The current the PSU was set to in Amps as a float
         """
         self.checkCurrent(mA)
 
-        A = float(mA) / 1000.0
-        command = "ISET:{amperes:.3f}".format(amperes=A)
+        command = "ISET:{amperes}".format(amperes=_milliToFixed(mA, 3))
 
         self._sendCommand(command)
-        readcurrent = self.readCurrent()
-        readMilliamps = int(readcurrent * 1000)
+        if not verify:
+            return mA / 1000.0
 
-        if readMilliamps != mA:
-            raise TenmaException("Set {mA}mA, but read {readMilliamps}mA".format(
-                mA=mA,
-                readMilliamps=readMilliamps
-            ))
-        return float(readcurrent)
+        return _verifyReadback(mA, self.readCurrent(), "A")
 
     def readVoltage(self):
         """
@@ -1386,33 +2053,26 @@ class Tenma72_13360_base(object):
 
             :return: Voltage in Volts as a float
         """
-        commandCheck = "VSET?"
-        self._sendCommand(commandCheck)
-        return float(self.__readOutput())
+        return float(self._query(b"VSET?"))
 
-    def setVoltage(self, mV):
+    def setVoltage(self, mV, verify=True):
         """
             Sets the voltage
 
             :param mV: voltage to set the PSU to, in mV
+            :param verify: Read the voltage back to check it was set, defaults to True
             :raises TenmaException: If the voltage does not match what was set
             :return: The voltage the PSU was set to in Volts as a float
         """
         self.checkVoltage(mV)
 
-        volts = float(mV) / 1000.0
-        command = "VSET:{volts:.2f}".format(volts=volts)
+        command = "VSET:{volts}".format(volts=_milliToFixed(mV, 2))
 
         self._sendCommand(command)
-        readVolts = self.readVoltage()
-        readMillivolts = int(readVolts * 1000)
+        if not verify:
+            return mV / 1000.0
 
-        if readMillivolts != int(mV):
-            raise TenmaException("Set {mV}mV, but read {readMillivolts}mV".format(
-                mV=mV,
-                readMillivolts=readMillivolts
-            ))
-        return float(readVolts)
+        return _verifyReadback(mV, self.readVoltage(), "V")
 
     def runningCurrent(self):
         """
@@ -1420,9 +2080,7 @@ class Tenma72_13360_base(object):
 
             :return: The running current of the PSU in Amps as a float
         """
-        command = "IOUT?"
-        self._sendCommand(command)
-        return float(self.__readOutput())
+        return float(self._query(b"IOUT?"))
 
     def runningVoltage(self):
         """
@@ -1430,9 +2088,7 @@ class Tenma72_13360_base(object):
 
             :return: The running voltage of the PSU in volts as a float
         """
-        command = "VOUT?"
-        self._sendCommand(command)
-        return float(self.__readOutput())
+        return float(self._query(b"VOUT?"))
 
     def saveConf(self, conf):
         """
@@ -1449,7 +2105,7 @@ class Tenma72_13360_base(object):
             ))
 
         command = "SAV:{}".format(conf)
-        self._sendCommand(command)
+        self._sendCommand(command, wait=self.MEMORY_SETTLE_TIME)
 
     def saveConfFlow(self, conf):
         """
@@ -1468,7 +2124,7 @@ class Tenma72_13360_base(object):
                 conf=conf,
                 nconf=self.NCONFS
             ))
-        self._sendCommand("RCL:{}".format(conf))
+        self._sendCommand("RCL:{}".format(conf), wait=self.MEMORY_SETTLE_TIME)
 
     def setBEEP(self, enable=True):
         """
@@ -1479,9 +2135,7 @@ class Tenma72_13360_base(object):
 
             :param enable: Boolean to enable or disable
         """
-        enableFlag = 1 if enable else 0
-        command = "BEEP:{}".format(enableFlag)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_BEEP[bool(enable)])
 
     def setLock(self, enable=True):
         """
@@ -1489,22 +2143,19 @@ class Tenma72_13360_base(object):
 
             :param enable: Enable lock, defaults to True
         """
-        enableFlag = 1 if enable else 0
-        self._sendCommand("LOCK:{}".format(enableFlag))
+        self._sendCommand(self._CMD_LOCK[bool(enable)])
 
     def ON(self):
         """
             Turns on the output
         """
-        command = "OUT:1"
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_ON)
 
     def OFF(self):
         """
             Turns off the output
         """
-        command = "OUT:0"
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_OFF)
 
     def startAutoVoltageStep(self, startMillivolts,
                              stopMillivolts, stepMillivolts, stepTime):
@@ -1526,23 +2177,17 @@ class Tenma72_13360_base(object):
                     stepMillivolts=stepMillivolts,
                     stopMillivolts=stopMillivolts))
 
-        startVolts = float(startMillivolts) / 1000.0
-        stopVolts = float(stopMillivolts) / 1000.0
-        stepVolts = float(stepMillivolts) / 1000.0
-
-        command = "VASTEP:{startVolts},{stopVolts},{stepVolts},{stepTime}".format(
-            startVolts=startVolts,
-            stopVolts=stopVolts,
-            stepVolts=stepVolts,
-            stepTime=stepTime
-        )
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_VASTEP % (
+            *_milliSplit(startMillivolts),
+            *_milliSplit(stopMillivolts),
+            *_milliSplit(stepMillivolts),
+            stepTime))
 
     def stopAutoVoltageStep(self):
         """
             Stops the auto voltage step
         """
-        self._sendCommand("VASTOP")
+        self._sendCommand(b"VASTOP")
 
     def startAutoCurrentStep(self, startMilliamps,
                              stopMilliamps, stepMilliamps, stepTime):
@@ -1564,23 +2209,17 @@ class Tenma72_13360_base(object):
                     stepMilliamps=stepMilliamps,
                     stopMilliamps=stopMilliamps))
 
-        startAmps = float(startMilliamps) / 1000.0
-        stopAmps = float(stopMilliamps) / 1000.0
-        stepAmps = float(stepMilliamps) / 1000.0
-
-        command = "IASTEP:{startAmps},{stopAmps},{stepAmps},{stepTime}".format(
-            startAmps=startAmps,
-            stopAmps=stopAmps,
-            stepAmps=stepAmps,
-            stepTime=stepTime
-        )
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_IASTEP % (
+            *_milliSplit(startMilliamps),
+            *_milliSplit(stopMilliamps),
+            *_milliSplit(stepMilliamps),
+            stepTime))
 
     def stopAutoCurrentStep(self):
         """
             Stops the auto current step
         """
-        self._sendCommand("IASTOP")
+        self._sendCommand(b"IASTOP")
 
     def setManualVoltageStep(self, stepMillivolts):
         """
@@ -1591,23 +2230,21 @@ class Tenma72_13360_base(object):
             :param stepMillivolts: Voltage to step up or down by when triggered
         """
         self.checkVoltage(stepMillivolts)
-        stepVolts = float(stepMillivolts) / 1000.0
-        command = "VSTEP:{}".format(stepVolts)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_VSTEP % _milliSplit(stepMillivolts))
 
     def stepVoltageUp(self):
         """
             Increse the voltage by the configured step voltage
             Call "setManualVoltageStep" to set the step voltage
         """
-        self._sendCommand("VUP")
+        self._sendCommand(b"VUP")
 
     def stepVoltageDown(self):
         """
             Decrese the voltage by the configured step voltage
             Call "setManualVoltageStep" to set the step voltage
         """
-        self._sendCommand("VDOWN")
+        self._sendCommand(b"VDOWN")
 
     def setManualCurrentStep(self, stepMilliamps):
         """
@@ -1618,36 +2255,62 @@ class Tenma72_13360_base(object):
             :param stepMilliamps: Current to step up or down by when triggered
         """
         self.checkCurrent(stepMilliamps)
-        stepAmps = float(stepMilliamps) / 1000.0
-        command = "ISTEP:{}".format(stepAmps)
-        self._sendCommand(command)
+        self._sendCommand(self._CMD_ISTEP % _milliSplit(stepMilliamps))
 
     def stepCurrentUp(self):
         """
             Increse the current by the configured step current.
             Call "setManualCurrentStep" to set the step curchrent
         """
-        self._sendCommand("IUP")
+        self._sendCommand(b"IUP")
 
     def stepCurrentDown(self):
         """
             Decrese the current by the configured step current.
             Call "setManualCurrentStep" to set the step current
         """
-        self._sendCommand("IDOWN")
+        self._sendCommand(b"IDOWN")
 
     def setVoltagePriority(self):
         """
             Prioritize voltage
         """
-        self._sendCommand("PRIORITY:0")
+        self._sendCommand(b"PRIORITY:0")
 
     def setCurrentPriority(self):
         """
             Prioritize current
         """
-        self._sendCommand("PRIORITY:1")
+        self._sendCommand(b"PRIORITY:1")
 
 
 class Tenma72_13360(Tenma72_13360_base):
+    __slots__ = ()
+
     MATCH_STR = ["72-13360"]
+
+
+def _rebuildModelTable():
+    """
+        Rebuilds the (MATCH_STR, class) table and the MATCH_STR -> class
+        dict used to detect the unit model. Match strings are kept encoded,
+        the version reply is matched as bytes.
+
+        Both are built once at import time, call this after defining
+        new Tenma72Base subclasses so that they can be detected too.
+    """
+    _MODEL_TABLE[:] = [(matchString.encode("ascii"), cls)
+                       for cls in findSubclassesRecursively(Tenma72Base)
+                       for matchString in cls.MATCH_STR
+                       if matchString]
+    _MODEL_DISPATCH.clear()
+    # Earlier entries win, as they did in the scan
+    for matchString, cls in reversed(_MODEL_TABLE):
+        _MODEL_DISPATCH[matchString] = cls
+
+
+_MODEL_TABLE = []
+_MODEL_DISPATCH = {}
+#: Detected model class per device, see forgetDetectedModel()
+_IDENT_CACHE = {}
+_rebuildModelTable()
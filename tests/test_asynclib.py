@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+import serial
+
+serial_asyncio = pytest.importorskip('serial_asyncio')
+
+from tenma.tenmaAsyncLib import AsyncTenma72Base
+from tenma.tenmaDcLib import TenmaException, Tenma72_2540, Tenma72_13330
+
+
+class FakeTransport(object):
+    """
+        Stands in for the pyserial-asyncio transport, replying to known
+        command prefixes in two chunks like a slow serial line would
+    """
+
+    def __init__(self, protocol, replies):
+        self.protocol = protocol
+        self.replies = replies
+        self.written = []
+        #: Seconds the unit takes to answer
+        self.delay = 0
+        self.closed = False
+
+    def write(self, data):
+        self.written.append(data)
+        loop = asyncio.get_running_loop()
+        for command, reply in self.replies.items():
+            if data.startswith(command):
+                loop.call_later(self.delay, self.protocol.data_received, reply[:2])
+                loop.call_later(self.delay, self.protocol.data_received, reply[2:])
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    replies = {}
+
+    async def create_serial_connection(loop, protocol_factory, *args, **kwargs):
+        protocol = protocol_factory()
+        transport = FakeTransport(protocol, replies)
+        protocol.connection_made(transport)
+        return transport, protocol
+
+    monkeypatch.setattr(serial_asyncio, 'create_serial_connection', create_serial_connection)
+    return replies
+
+
+def test_open_detects_model(fake_connection):
+    fake_connection[b'*IDN?'] = b'TENMA 72-13330 V2.1\n'
+    fake_connection[b'STATUS?'] = b'\x41\n'
+
+    async def run():
+        psu = await AsyncTenma72Base.open('fake')
+        return psu, await psu.getStatus()
+
+    psu, status = asyncio.run(run())
+    assert psu.model is Tenma72_13330
+    assert status['out1Enabled'] is True
+    assert psu.transport.written == [b'*IDN?', b'STATUS?\n']
+
+
+def test_setVoltage_verifies(fake_connection):
+    fake_connection[b'VSET1?'] = b'05.00'
+
+    async def run():
+        psu = await AsyncTenma72Base.open('fake', model=Tenma72_2540)
+        return await psu.setVoltage(1, 5000)
+
+    assert asyncio.run(run()) == 5.0
+
+
+def test_commands_are_spaced_on_units_without_eol(fake_connection, monkeypatch):
+    fake_connection[b'VSET1?'] = b'05.00'
+    sleep = asyncio.sleep
+    delays = []
+
+    async def recordSleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, 'sleep', recordSleep)
+
+    async def run():
+        psu = await AsyncTenma72Base.open('fake', model=Tenma72_2540)
+        await psu.setVoltage(1, 5000)
+        await psu.ON()
+        await psu.OFF()
+        return psu
+
+    psu = asyncio.run(run())
+    assert psu.transport.written == [b'VSET1:5.00', b'VSET1?', b'OUT1', b'OUT0']
+    # Before VSET1? and OUT0. The reply to VSET1? already spaced OUT1
+    assert len(delays) == 2
+    assert all(0 < delay <= 10 * AsyncTenma72Base.BYTE_TIME + AsyncTenma72Base.COMMAND_GAP
+               for delay in delays)
+
+
+def test_model_rules_apply_to_ch3(fake_connection):
+    async def run():
+        psu = await AsyncTenma72Base.open('fake', model=Tenma72_13330)
+        with pytest.raises(TenmaException, match='CH3 can only be set'):
+            await psu.setVoltage(3, 4000)
+        with pytest.raises(TenmaException, match='CH3 does not support'):
+            await psu.readCurrent(3)
+        with pytest.raises(TenmaException, match='CH3 does not support'):
+            await psu.runningCurrent(3)
+        await psu.setVoltage(3, 3300, verify=False)
+        return psu
+
+    assert asyncio.run(run()).transport.written == [b'VSET3:3.30\n']
+
+
+def test_concurrent_queries_get_their_own_reply(fake_connection):
+    fake_connection[b'VSET1?'] = b'05.00'
+    fake_connection[b'ISET1?'] = b'1.000'
+
+    async def run():
+        psu = await AsyncTenma72Base.open('fake', model=Tenma72_2540)
+        psu.transport.delay = 0.02
+        return await asyncio.gather(psu.readVoltage(1), psu.readCurrent(1), psu.ON())
+
+    assert asyncio.run(run()) == [5.0, 1.0, None]
+
+
+def test_open_closes_port_when_detection_fails(fake_connection, monkeypatch):
+    transports = []
+    create = serial_asyncio.create_serial_connection
+
+    async def create_serial_connection(*args, **kwargs):
+        transport, protocol = await create(*args, **kwargs)
+        transports.append(transport)
+        return transport, protocol
+
+    async def detectModel(self):
+        raise serial.SerialException('unplugged')
+
+    monkeypatch.setattr(serial_asyncio, 'create_serial_connection', create_serial_connection)
+    monkeypatch.setattr(AsyncTenma72Base, '_detectModel', detectModel)
+    with pytest.raises(serial.SerialException):
+        asyncio.run(AsyncTenma72Base.open('fake'))
+    assert transports[0].closed
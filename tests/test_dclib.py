@@ -1,4 +1,13 @@
-from tenma.tenmaDcLib import findSubclassesRecursively
+import os
+import time
+
+import pytest
+import serial
+
+from tenma import tenmaDcLib
+from tenma.tenmaDcLib import (findSubclassesRecursively, instantiate_tenma_class_from_device_response,
+                              TenmaException, Tenma72_2540, Tenma72_2550, Tenma72_13330, Tenma72_13360,
+                              forgetDetectedModel, _milliToFixed, _modelForVersion)
 
 class Base(object):
     MATCH_STR = ['']
@@ -19,4 +28,260 @@ def test_findSubclassesRecursively():
     for cls in findSubclassesRecursively(Base):
         actual_classes.append(cls.MATCH_STR)
     actual_classes.sort()
-    assert actual_classes == expected_classes
\ No newline at end of file
+    assert actual_classes == expected_classes
+
+
+class FakeSerial(object):
+    """
+        Stands in for serial.Serial, replying to known command prefixes
+    """
+    REPLIES = {}
+
+    def __init__(self, *args, **kwargs):
+        self.written = []
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        for command, reply in self.REPLIES.items():
+            if data.startswith(command):
+                self.buffer += reply
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        return len(self.buffer)
+
+    def read(self, size=1):
+        out = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return out
+
+    def read_until(self, expected=b'\n', size=None):
+        end = self.buffer.find(expected)
+        return self.read(len(self.buffer) if end < 0 else end + len(expected))
+
+    def reset_input_buffer(self):
+        del self.buffer[:]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_serial(monkeypatch):
+    monkeypatch.setattr(serial, 'Serial', FakeSerial)
+    monkeypatch.setattr(FakeSerial, 'REPLIES', {})
+    monkeypatch.setattr(tenmaDcLib, '_IDENT_CACHE', {})
+    return FakeSerial
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason='needs a pty')
+def test_low_latency_is_optional_on_ports_without_it():
+    master, slave = os.openpty()
+    try:
+        psu = Tenma72_2540(os.ttyname(slave))
+        psu.close()
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+def test_recallConf_sends_slot(fake_serial):
+    psu = Tenma72_2540('fake')
+    psu.recallConf(3)
+    assert psu.serialHandler.ser.written == [b'RCL3']
+
+
+def test_getStatus_decodes_status_byte(fake_serial):
+    fake_serial.REPLIES = {b'STATUS?': b'\x5d'}
+    psu = Tenma72_2540('fake')
+    assert psu.getStatus() == {
+        "ch1Mode": "C.V",
+        "ch2Mode": "C.C",
+        "Tracking": "Tracking Parallel",
+        "BeepEnabled": True,
+        "lockEnabled": False,
+        "outEnabled": True
+    }
+    # entries are shared between calls, a caller must not be able to alter them
+    psu.getStatus()["outEnabled"] = False
+    assert psu.getStatus()["outEnabled"] is True
+
+
+def test_getStatus_decodes_13360_status_byte(fake_serial):
+    fake_serial.REPLIES = {b'STATUS?': b'\x0a\n'}
+    psu = Tenma72_13360('fake')
+    assert psu.getStatus() == {
+        "channelMode ": "C.C",
+        "output ": "ON",
+        "V/C priority ": "Voltage priority",
+        "beep ": "OFF",
+        "lock ": "OFF",
+    }
+
+
+def test_13360_readers_drop_stale_input(fake_serial):
+    fake_serial.REPLIES = {b'VOUT?': b'12.34\n'}
+    psu = Tenma72_13360('fake')
+    psu.serialHandler.ser.buffer += b'0.000\n'
+    assert psu.runningVoltage() == 12.34
+
+
+def test_setCurrent_verify_rounds_readback(fake_serial):
+    fake_serial.REPLIES = {b'ISET1?': b'1.005'}
+    psu = Tenma72_2540('fake')
+    assert psu.setCurrent(1, 1005) == 1.005
+
+
+def test_saveConfFlow_accepts_its_own_readbacks(fake_serial, monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    fake_serial.REPLIES = {b'VSET1?': b'02.01', b'ISET1?': b'1.005'}
+    psu = Tenma72_2540('fake')
+    psu.saveConfFlow(1, 1)
+    assert b'VSET1:2.01' in psu.serialHandler.ser.written
+    assert b'ISET1:1.005' in psu.serialHandler.ser.written
+
+
+def test_cacheSettings_skips_repeated_setters(fake_serial):
+    psu = Tenma72_2540('fake', cacheSettings=True)
+    psu.setOCP(True)
+    psu.setOCP(True)
+    assert psu.setVoltage(1, 5000, verify=False) == 5.0
+    assert psu.setVoltage(1, 5000, verify=False) == 5.0
+    psu.recallConf(1)
+    psu.setOCP(True)
+    assert psu.serialHandler.ser.written == [b'OCP1', b'VSET1:5.00', b'RCL1', b'OCP1']
+
+
+def test_cacheSettings_still_verifies_when_asked(fake_serial):
+    fake_serial.REPLIES = {b'VSET1?': b'05.00'}
+    psu = Tenma72_2540('fake', cacheSettings=True)
+    psu.setVoltage(1, 5000, verify=False)
+    assert psu.setVoltage(1, 5000) == 5.0
+    assert psu.setVoltage(1, 5000) == 5.0
+    psu.setVoltage(1, 5000, verify=False)
+    assert psu.serialHandler.ser.written == [b'VSET1:5.00', b'VSET1:5.00', b'VSET1?']
+
+
+def test_channel_may_be_given_as_string(fake_serial):
+    fake_serial.REPLIES = {b'VSET1?': b'05.00'}
+    psu = Tenma72_2540('fake')
+    assert psu.readVoltage('1') == 5.0
+    assert psu.setVoltage('1', 5000, verify=False) == 5.0
+    with pytest.raises(TenmaException, match='CH2 not in range'):
+        psu.readCurrent('2')
+
+
+def test_setVoltage_without_verify_skips_readback(fake_serial):
+    psu = Tenma72_2540('fake')
+    assert psu.setVoltage(1, 5000, verify=False) == 5.0
+    assert psu.serialHandler.ser.written == [b'VSET1:5.00']
+
+
+def test_write_only_commands_are_spaced_not_slept(fake_serial, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    psu = Tenma72_2540('fake')
+    psu.ON()
+    assert sleeps == []
+    psu.OFF()
+    assert len(sleeps) == 1
+    assert 0 < sleeps[0] <= psu.serialHandler.COMMAND_GAP + 4 * psu.serialHandler.BYTE_TIME
+    assert psu.serialHandler.ser.written == [b'OUT1', b'OUT0']
+
+
+def test_applyChannelConfig_validates_before_sending(fake_serial):
+    psu = Tenma72_13330('fake')
+    with pytest.raises(TenmaException):
+        psu.applyChannelConfig(3, mV=12000, beep=False)
+    assert psu.serialHandler.ser.written == []
+
+    fake_serial.REPLIES = {b'VSET1?': b'12.00\n'}
+    psu.applyChannelConfig(1, mV=12000, beep=False)
+    assert psu.serialHandler.ser.written == [b'BEEP0\nVSET1:12.00\n', b'VSET1?\n']
+
+
+def test_generated_checks_use_model_limits(fake_serial):
+    psu = Tenma72_13330('fake')
+    psu.checkChannel(3)
+    psu.checkVoltage(1, psu.MAX_MV)
+    with pytest.raises(TenmaException, match='CH4 not in range'):
+        psu.checkChannel(4)
+    with pytest.raises(TenmaException, match='maximum is {}mA'.format(psu.MAX_MA)):
+        psu.checkCurrent(1, psu.MAX_MA + 1)
+
+
+def test_sendCommands_joins_commands_into_one_write(fake_serial):
+    psu = Tenma72_13330('fake')
+    psu._sendCommands((psu._CMD_OFF, psu._CMD_ON))
+    assert psu.serialHandler.ser.written == [b'OUT12:0\nOUT12:1\n']
+
+
+def test_instantiate_reuses_port_for_detected_model(fake_serial):
+    fake_serial.REPLIES = {b'*IDN?': b'TENMA 72-13330 V2.1\n'}
+    psu = instantiate_tenma_class_from_device_response('fake')
+    assert isinstance(psu, Tenma72_13330)
+    psu.ON()
+    assert psu.serialHandler.ser.written == [b'*IDN?', b'OUT12:1\n']
+
+
+def test_instantiate_remembers_detected_model(fake_serial):
+    fake_serial.REPLIES = {b'*IDN?': b'TENMA 72-13330 V2.1\n'}
+    instantiate_tenma_class_from_device_response('fake')
+    psu = instantiate_tenma_class_from_device_response('fake')
+    assert isinstance(psu, Tenma72_13330)
+    assert psu.serialHandler.ser.written == []
+
+    forgetDetectedModel('fake')
+    fake_serial.REPLIES = {b'*IDN?': b'TENMA 72-2540 V2.1'}
+    assert isinstance(instantiate_tenma_class_from_device_response('fake'), Tenma72_2540)
+
+
+def test_negative_step_values_are_rejected(fake_serial):
+    psu = Tenma72_13330('fake')
+    with pytest.raises(TenmaException, match='Negative value -100m'):
+        psu.startAutoVoltageStep(1, -100, 5000, 500, 1)
+    with pytest.raises(TenmaException, match='Negative value'):
+        psu.startAutoCurrentStep(1, -100, 1000, 100, 1)
+    assert psu.serialHandler.ser.written == []
+
+
+def test_restarted_auto_step_is_sent_again(fake_serial):
+    psu = Tenma72_13330('fake')
+    psu.startAutoVoltageStep(1, 1000, 5000, 500, 1)
+    psu.stopAutoVoltageStep(1)
+    psu.startAutoVoltageStep(1, 1000, 5000, 500, 1)
+    assert psu.serialHandler.ser.written == [
+        b'VASTEP1:1.000,5.000,0.500,1\n', b'VASTOP1\n', b'VASTEP1:1.000,5.000,0.500,1\n']
+
+
+def test_manual_step_is_formatted_without_floats(fake_serial):
+    psu = Tenma72_13330('fake')
+    psu.setManualVoltageStep(1, 300)
+    psu.setManualCurrentStep(2, 1001)
+    assert psu.serialHandler.ser.written == [b'VSTEP1:0.300\n', b'ISTEP2:1.001\n']
+
+
+@pytest.mark.parametrize('version, expected', [
+    (b'TENMA 72-2540 V2.1', Tenma72_2540),
+    (b'TENMA 72-13330 V2.1\n', Tenma72_13330),
+    (b'TENMA72-13330V2.1', Tenma72_13330),
+    (b'KORADKA6003PV2.0', Tenma72_2550),
+    (b'UNKNOWN PSU', None),
+])
+def test_modelForVersion(version, expected):
+    assert _modelForVersion(version) is expected
+
+
+@pytest.mark.parametrize('milli, decimals, expected', [
+    (0, 3, '0.000'),
+    (999, 3, '0.999'),
+    (3100, 3, '3.100'),
+    (5000, 2, '5.00'),
+    (12344, 2, '12.34'),
+    (12345, 2, '12.35'),
+    (1.234 * 1000, 3, '1.234'),
+])
+def test_milliToFixed(milli, decimals, expected):
+    assert _milliToFixed(milli, decimals) == expected